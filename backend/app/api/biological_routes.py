@@ -1,10 +1,26 @@
-from fastapi import APIRouter, HTTPException, Path
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Path, Response
+from pydantic import TypeAdapter
+from typing import List, Dict, Any, Optional, Tuple, Type
+from functools import lru_cache
 import os
 import json
 
+# orjson parses JSON several times faster than the stdlib; fall back if missing
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# ijson lets large files be validated item by item instead of loaded whole
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
 from models.biological_models import (
-    Species, OrthoGroup, Gene, 
+    Species, OrthoGroup, Gene, GoTerm,
     SpeciesResponse, OrthoGroupResponse, GeneResponse, GeneDetailResponse
 )
 
@@ -18,24 +34,142 @@ router = APIRouter(
 # Mock data path - in a real application this would come from a database
 MOCK_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "mock_data")
 
+# Files larger than this are streamed when building model lists
+STREAM_THRESHOLD_BYTES = 1024 * 1024
+
+# Parsed files are cached per (filename, mtime) so edits on disk are picked up
+@lru_cache(maxsize=16)
+def _load_mock_file(filename: str, mtime: float) -> Dict[str, Any]:
+    file_path = os.path.join(MOCK_DATA_DIR, filename)
+    if HAS_ORJSON:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
 # Helper function to load mock data
 def load_mock_data(filename: str) -> Dict[str, Any]:
     try:
         file_path = os.path.join(MOCK_DATA_DIR, filename)
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        return _load_mock_file(filename, os.path.getmtime(file_path))
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"Error loading mock data: {e}")
         return {}
 
+def _file_mtime(filename: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(os.path.join(MOCK_DATA_DIR, filename))
+    except OSError as e:
+        print(f"Error loading mock data: {e}")
+        return None
+
+@lru_cache(maxsize=4)
+def _species_tree_body(mtime: Optional[float]) -> bytes:
+    """Raw species tree JSON, checked once per file version and sent as-is"""
+    if mtime is not None:
+        with open(os.path.join(MOCK_DATA_DIR, "species_tree.json"), 'rb') as f:
+            raw = f.read()
+        try:
+            if HAS_ORJSON:
+                orjson.loads(raw)
+            else:
+                json.loads(raw)
+            return raw
+        except ValueError as e:
+            print(f"Error loading mock data: {e}")
+    return orjson.dumps({}) if HAS_ORJSON else json.dumps({}).encode()
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def _stream_models(file_path: str, key: str, model: Type) -> Tuple:
+    """Validate the items of a large file's ``key`` array while streaming it from disk"""
+    try:
+        with open(file_path, 'rb') as f:
+            return tuple(
+                model.model_validate(item)
+                for item in ijson.items(f, f"{key}.item", use_float=True)
+            )
+    except ijson.JSONError as e:
+        print(f"Error loading mock data: {e}")
+        return ()
+
+@lru_cache(maxsize=16)
+def _build_models(filename: str, key: str, model: Type, mtime: Optional[float]) -> Tuple:
+    """Validated models for a mock file, rebuilt only when the file changes"""
+    if mtime is None:
+        return ()
+    file_path = os.path.join(MOCK_DATA_DIR, filename)
+    if HAS_IJSON and os.path.getsize(file_path) > STREAM_THRESHOLD_BYTES:
+        return _stream_models(file_path, key, model)
+    try:
+        data = _load_mock_file(filename, mtime)
+    except json.JSONDecodeError as e:
+        print(f"Error loading mock data: {e}")
+        return ()
+    # Validate the whole list in one call to the compiled core validator
+    return tuple(_list_adapter(model).validate_python(data.get(key, [])))
+
+def _species_cache() -> Tuple[Species, ...]:
+    return _build_models("species.json", "species", Species, _file_mtime("species.json"))
+
+@lru_cache(maxsize=4)
+def _build_index(species_mtime: Optional[float],
+                 orthogroups_mtime: Optional[float],
+                 genes_mtime: Optional[float]) -> Dict[str, Dict[str, Any]]:
+    """Hash indices over the mock data so lookups don't scan the full lists"""
+    species_list = _build_models("species.json", "species", Species, species_mtime)
+    all_orthogroups = _build_models("orthogroups.json", "orthogroups", OrthoGroup, orthogroups_mtime)
+    all_genes = _build_models("genes.json", "genes", Gene, genes_mtime)
+
+    species_by_id: Dict[str, Species] = {}
+    for species in species_list:
+        species_by_id.setdefault(species.id, species)
+
+    orthogroup_by_id: Dict[str, OrthoGroup] = {}
+    orthogroups_by_species: Dict[str, List[OrthoGroup]] = {}
+    for og in all_orthogroups:
+        orthogroup_by_id.setdefault(og.id, og)
+        for species_id in dict.fromkeys(og.species):
+            orthogroups_by_species.setdefault(species_id, []).append(og)
+
+    gene_by_id: Dict[str, Gene] = {}
+    genes_by_orthogroup: Dict[str, List[Gene]] = {}
+    for gene in all_genes:
+        gene_by_id.setdefault(gene.id, gene)
+        genes_by_orthogroup.setdefault(gene.orthogroup_id, []).append(gene)
+
+    # Frozen once here so the GO endpoint is a single lookup with nothing to copy
+    go_terms_by_gene: Dict[str, Tuple[GoTerm, ...]] = {
+        gene_id: tuple(gene.go_terms)
+        for gene_id, gene in gene_by_id.items()
+        if gene.go_terms
+    }
+
+    return {
+        "species_by_id": species_by_id,
+        "orthogroup_by_id": orthogroup_by_id,
+        "orthogroups_by_species": orthogroups_by_species,
+        "gene_by_id": gene_by_id,
+        "genes_by_orthogroup": genes_by_orthogroup,
+        "go_terms_by_gene": go_terms_by_gene,
+    }
+
+def _mock_index() -> Dict[str, Dict[str, Any]]:
+    return _build_index(
+        _file_mtime("species.json"),
+        _file_mtime("orthogroups.json"),
+        _file_mtime("genes.json"),
+    )
+
 # Routes
 @router.get("/species", response_model=SpeciesResponse)
 async def get_species():
     """Get all species"""
     try:
         # Load mock data
-        data = load_mock_data("species.json")
-        species_list = [Species(**item) for item in data.get("species", [])]
+        species_list = _species_cache()
         
         return {
             "success": True,
@@ -52,8 +186,9 @@ async def get_species():
 async def get_species_tree():
     """Get species tree for visualization"""
     try:
-        data = load_mock_data("species_tree.json")
-        return data
+        # The file is already JSON; skip the parse/re-serialize round trip
+        body = _species_tree_body(_file_mtime("species_tree.json"))
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load species tree: {str(e)}")
 
@@ -61,11 +196,8 @@ async def get_species_tree():
 async def get_species_by_id(species_id: str = Path(..., title="Species ID")):
     """Get species by ID"""
     try:
-        data = load_mock_data("species.json")
-        species_list = [Species(**item) for item in data.get("species", [])]
-        
-        # Filter by ID
-        filtered_species = [species for species in species_list if species.id == species_id]
+        species = _mock_index()["species_by_id"].get(species_id)
+        filtered_species = [species] if species else []
         
         if not filtered_species:
             return {
@@ -89,11 +221,8 @@ async def get_species_by_id(species_id: str = Path(..., title="Species ID")):
 async def get_species_orthogroups(species_id: str = Path(..., title="Species ID")):
     """Get orthogroups for a specific species"""
     try:
-        data = load_mock_data("orthogroups.json")
-        all_orthogroups = [OrthoGroup(**item) for item in data.get("orthogroups", [])]
-        
-        # Filter orthogroups that contain the specified species
-        filtered_orthogroups = [og for og in all_orthogroups if species_id in og.species]
+        # Orthogroups that contain the specified species
+        filtered_orthogroups = _mock_index()["orthogroups_by_species"].get(species_id, [])
         
         return {
             "success": True,
@@ -112,11 +241,8 @@ async def get_species_orthogroups(species_id: str = Path(..., title="Species ID"
 async def get_orthogroup_by_id(og_id: str = Path(..., title="Orthogroup ID")):
     """Get orthogroup by ID"""
     try:
-        data = load_mock_data("orthogroups.json")
-        all_orthogroups = [OrthoGroup(**item) for item in data.get("orthogroups", [])]
-        
-        # Filter by ID
-        filtered_orthogroups = [og for og in all_orthogroups if og.id == og_id]
+        orthogroup = _mock_index()["orthogroup_by_id"].get(og_id)
+        filtered_orthogroups = [orthogroup] if orthogroup else []
         
         if not filtered_orthogroups:
             return {
@@ -141,11 +267,8 @@ async def get_orthogroup_genes(og_id: str = Path(..., title="Orthogroup ID")):
     """Get genes for a specific orthogroup"""
     try:
         # First get the orthogroup to check if it exists
-        orthogroup_data = load_mock_data("orthogroups.json")
-        all_orthogroups = [OrthoGroup(**item) for item in orthogroup_data.get("orthogroups", [])]
-        
-        # Find the specified orthogroup
-        orthogroup = next((og for og in all_orthogroups if og.id == og_id), None)
+        index = _mock_index()
+        orthogroup = index["orthogroup_by_id"].get(og_id)
         
         if not orthogroup:
             return {
@@ -155,12 +278,8 @@ async def get_orthogroup_genes(og_id: str = Path(..., title="Orthogroup ID")):
                 "orthogroup_id": og_id
             }
         
-        # Now get all genes
-        gene_data = load_mock_data("genes.json")
-        all_genes = [Gene(**item) for item in gene_data.get("genes", [])]
-        
-        # Filter genes that belong to the specified orthogroup
-        filtered_genes = [gene for gene in all_genes if gene.orthogroup_id == og_id]
+        # Genes that belong to the specified orthogroup
+        filtered_genes = index["genes_by_orthogroup"].get(og_id, [])
         
         return {
             "success": True,
@@ -179,11 +298,7 @@ async def get_orthogroup_genes(og_id: str = Path(..., title="Orthogroup ID")):
 async def get_gene_by_id(gene_id: str = Path(..., title="Gene ID")):
     """Get gene details by ID"""
     try:
-        gene_data = load_mock_data("genes.json")
-        all_genes = [Gene(**item) for item in gene_data.get("genes", [])]
-        
-        # Find the gene with the specified ID
-        gene = next((g for g in all_genes if g.id == gene_id), None)
+        gene = _mock_index()["gene_by_id"].get(gene_id)
         
         if not gene:
             return {
@@ -207,13 +322,9 @@ async def get_gene_by_id(gene_id: str = Path(..., title="Gene ID")):
 async def get_gene_go_terms(gene_id: str = Path(..., title="Gene ID")):
     """Get GO terms for a specific gene"""
     try:
-        gene_data = load_mock_data("genes.json")
-        all_genes = [Gene(**item) for item in gene_data.get("genes", [])]
-        
-        # Find the gene with the specified ID
-        gene = next((g for g in all_genes if g.id == gene_id), None)
+        terms = _mock_index()["go_terms_by_gene"].get(gene_id)
         
-        if not gene or not gene.go_terms:
+        if not terms:
             return {
                 "success": False,
                 "message": f"GO terms for gene {gene_id} not found",
@@ -222,7 +333,7 @@ async def get_gene_go_terms(gene_id: str = Path(..., title="Gene ID")):
         
         return {
             "success": True,
-            "terms": gene.go_terms,
+            "terms": terms,
             "gene_id": gene_id
         }
     except Exception as e:
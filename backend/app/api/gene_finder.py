@@ -2,6 +2,7 @@
 Helper module for efficiently finding genes in orthologues data
 """
 import logging
+import re
 import pandas as pd
 from typing import Dict, Optional
 
@@ -11,6 +12,23 @@ logger = logging.getLogger(__name__)
 # Gene to orthogroup mapping
 _gene_to_orthogroup_map = {}
 
+# A gene is a non-blank run between commas; compiled once for every column counted
+_GENE_TOKEN = re.compile(r'[^,\s]+')
+
+def _fill_gene_map(orthogroup_ids, species_cells, gene_map):
+    """Index rows into ``gene_map``"""
+    # Rows stay in order so a gene listed twice keeps the last orthogroup.
+    # All genes of a row store the same orthogroup_id object, so map values
+    # are already one string per orthogroup; interning would only add a table
+    for orthogroup_id, cells in zip(orthogroup_ids, species_cells):
+        for cell_value in cells:
+            if not isinstance(cell_value, str):
+                continue
+            for gene in cell_value.split(','):
+                gene = gene.strip()
+                if gene:
+                    gene_map[gene] = orthogroup_id
+
 def build_gene_to_orthogroup_map(df: pd.DataFrame) -> Dict[str, str]:
     """Build a mapping from gene IDs to orthogroup IDs for faster lookups"""
     gene_map = {}
@@ -18,24 +36,10 @@ def build_gene_to_orthogroup_map(df: pd.DataFrame) -> Dict[str, str]:
     
     try:
         logger.info("Building gene-to-orthogroup mapping cache...")
-        # Process each row in the dataframe
-        for idx, row in df.iterrows():
-            if idx % 1000 == 0:
-                logger.debug(f"Processing row {idx}/{len(df)}")
-                
-            orthogroup_id = str(row[orthogroup_col])
-            
-            # Process each species column
-            for col in df.columns[1:]:
-                cell_value = row[col]
-                if not isinstance(cell_value, str) or not cell_value.strip():
-                    continue
-                    
-                # Process each gene in the cell
-                for gene in cell_value.split(','):
-                    gene = gene.strip()
-                    if gene:
-                        gene_map[gene] = orthogroup_id
+        # Walk plain numpy object arrays instead of boxing a Series per row
+        orthogroup_ids = df[orthogroup_col].astype(str).to_numpy()
+        species_cells = df.iloc[:, 1:].to_numpy()
+        _fill_gene_map(orthogroup_ids, species_cells, gene_map)
         
         logger.info(f"Successfully built gene-to-orthogroup map with {len(gene_map)} entries")
         return gene_map
@@ -43,25 +47,46 @@ def build_gene_to_orthogroup_map(df: pd.DataFrame) -> Dict[str, str]:
         logger.error(f"Error building gene-to-orthogroup map: {str(e)}")
         return {}
 
-def find_gene_orthogroup(gene_id: str, gene_map: Dict[str, str], df: pd.DataFrame) -> Optional[str]:
-    """Find orthogroup for a gene using the prebuilt mapping"""
-    logger.info(f"Searching for gene {gene_id} in orthogroups data")
-    logger.info(f"Gene map has {len(gene_map)} entries")
-    logger.info(f"Dataframe shape: {df.shape}")
+def count_genes_by_species(df: pd.DataFrame) -> Dict[str, int]:
+    """Count the genes listed in each species column, one vectorized pass per column"""
+    counts = {}
+    for col in df.columns[1:]:
+        cells = df[col].dropna().astype(str)
+        counts[col] = int(cells.str.count(_GENE_TOKEN).sum())
+    return counts
+
+def find_gene_orthogroup(gene_id: str, gene_map: Dict[str, str], df: pd.DataFrame,
+                         scan_on_miss: bool = True) -> Optional[str]:
+    """Find orthogroup for a gene using the prebuilt mapping
+
+    Pass ``scan_on_miss=False`` when ``gene_map`` indexes every cell of ``df``:
+    a miss is then a definite answer and the full-table scan is skipped.
+    """
+    # This runs on every search: log lazily and at debug level so nothing
+    # is formatted unless debug output is actually enabled
+    logger.debug("Searching for gene %s (gene map: %d entries, dataframe: %s)",
+                 gene_id, len(gene_map), df.shape)
     
     # First, try to find the gene in the prebuilt mapping (fast path)
-    if gene_id in gene_map:
-        logger.info(f"Found gene {gene_id} in orthogroup {gene_map[gene_id]} using cached mapping")
-        return gene_map[gene_id]
+    orthogroup_id = gene_map.get(gene_id)
+    if orthogroup_id is not None:
+        logger.debug("Found gene %s in orthogroup %s using cached mapping", gene_id, orthogroup_id)
+        return orthogroup_id
+    if not scan_on_miss:
+        logger.debug("Gene %s not in the complete gene map", gene_id)
+        return None
     
     # If not found in the map, fall back to the slower method
-    logger.info(f"Gene {gene_id} not found in cache, using fallback search")
-    logger.info(f"Searching through {len(df.columns)-1} species columns")
+    logger.debug("Gene %s not found in cache, searching %d species columns",
+                 gene_id, len(df.columns) - 1)
     
     # Sample some data to help debug
-    sample_col = df.columns[1]  # First species column
-    sample_data = df[sample_col].head()
-    logger.info(f"Sample data from {sample_col}:\n{sample_data}")
+    if logger.isEnabledFor(logging.DEBUG):
+        sample_col = df.columns[1]  # First species column
+        logger.debug("Sample data from %s:\n%s", sample_col, df[sample_col].head())
+    
+    # A cell matches when the gene is one of its comma-separated entries, not a substring
+    gene_pattern = rf"(?:^|,)\s*{re.escape(gene_id)}\s*(?:,|$)"
     
     # Rechercher le gène dans toutes les colonnes
     for col in df.columns:
@@ -69,22 +94,25 @@ def find_gene_orthogroup(gene_id: str, gene_map: Dict[str, str], df: pd.DataFram
         if col == df.columns[0]:
             continue
             
+        cells = df[col]
+        if pd.api.types.is_object_dtype(cells) and not pd.api.types.is_string_dtype(cells):
+            # Mixed column (NaN, numbers): only its string cells can list genes
+            cells = cells.where(cells.map(type) == str, '')
+            
         # Vérifier si le gène est dans cette colonne (espèce)
-        if df[col].dtype == 'object':  # Vérifier que la colonne contient des chaînes de caractères
-            # Check for exact match by splitting on commas and comparing
-            mask = df[col].apply(lambda x: isinstance(x, str) and gene_id in [g.strip() for g in str(x).split(',')])
+        if pd.api.types.is_string_dtype(cells):  # Vérifier que la colonne contient des chaînes de caractères
+            # Exact match on a whole comma-separated entry, evaluated by pandas' string engine
+            mask = cells.str.contains(gene_pattern, regex=True, na=False)
             matches = mask.sum()
             if matches > 0:
-                logger.info(f"Found {matches} matches in column {col}")
                 # Retourner l'ID d'orthogroupe pour la ligne correspondante
                 result = str(df.loc[mask, df.columns[0]].iloc[0])
-                logger.info(f"Found gene {gene_id} in orthogroup {result} using fallback search")
+                logger.debug("Found gene %s in orthogroup %s using fallback search (%d matches in column %s)",
+                             gene_id, result, matches, col)
                 
                 # Add to cache for future lookups
                 gene_map[gene_id] = result
                 return result
-            else:
-                logger.debug(f"No matches in column {col}")
     
-    logger.info(f"Gene {gene_id} not found in any orthogroup")
+    logger.info("Gene %s not found in any orthogroup", gene_id)
     return None
\ No newline at end of file
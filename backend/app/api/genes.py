@@ -1,14 +1,23 @@
 from fastapi import APIRouter, Query, HTTPException, status
+from fastapi.responses import JSONResponse
 from typing import Optional
 
+try:
+    import orjson  # noqa: F401 - required by ORJSONResponse
+    from fastapi.responses import ORJSONResponse as GeneJSONResponse
+    HAS_ORJSON = True
+except ImportError:
+    GeneJSONResponse = JSONResponse
+    HAS_ORJSON = False
+
 from app.models.biological_models import GeneResponse, GeneDetailResponse
 from app.services.gene_search_service import GeneSearchService
 
-router = APIRouter(prefix="/api", tags=["genes"])
+router = APIRouter(prefix="/api", tags=["genes"], default_response_class=GeneJSONResponse)
 service = GeneSearchService()
 
 @router.get("/gene/{gene_id}", response_model=GeneDetailResponse)
-async def get_gene_by_id(gene_id: str):
+def get_gene_by_id(gene_id: str):
     """Get gene details by ID.
     
     Args:
@@ -20,7 +29,7 @@ async def get_gene_by_id(gene_id: str):
     return service.get_gene_by_id(gene_id)
 
 @router.get("/orthogroup/{og_id}/genes", response_model=GeneResponse)
-async def get_orthogroup_genes(og_id: str):
+def get_orthogroup_genes(og_id: str):
     """Get genes for a specific orthogroup.
     
     Args:
@@ -29,10 +38,12 @@ async def get_orthogroup_genes(og_id: str):
     Returns:
         List of genes belonging to the specified orthogroup
     """
-    return service.get_genes_by_orthogroup(og_id)
+    # The service already returns plain records; serialize them directly
+    # instead of re-validating the whole list against GeneResponse
+    return GeneJSONResponse(content=service.get_genes_by_orthogroup(og_id))
 
 @router.get("/species/{species_id}/genes", response_model=GeneResponse)
-async def get_species_genes(species_id: str):
+def get_species_genes(species_id: str):
     """Get genes for a specific species.
     
     Args:
@@ -44,7 +55,7 @@ async def get_species_genes(species_id: str):
     return service.get_genes_by_species(species_id)
 
 @router.get("/genes/search")
-async def search_genes(
+def search_genes(
     query: str = Query(..., description="Search query for gene name or ID"),
     limit: int = Query(10, ge=1, le=100, description="Maximum number of results to return")
 ):
@@ -60,7 +71,7 @@ async def search_genes(
     return service.search_genes(query, limit)
 
 @router.get("/gene/{gene_id}/go_terms")
-async def get_gene_go_terms(gene_id: str):
+def get_gene_go_terms(gene_id: str):
     """Get GO terms for a specific gene.
     
     Args:
@@ -1,21 +1,40 @@
 from fastapi import APIRouter, HTTPException, Path, Query
-from typing import List, Dict, Any, Optional
+from fastapi.responses import FileResponse, Response
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from itertools import islice
 import os
 import json
+import asyncio
 import pandas as pd
 import logging
 import tempfile
-import base64
+import hashlib
+import re
+import pickle
+import threading
+import weakref
+import bisect
+import glob
 from ..models.phylo import (
     OrthologueSearchRequest, OrthologueSearchResponse, OrthologueData, OrthoSpeciesCount,
     ETESearchRequest, ETESearchResponse, ETESearchResult
 )
 from ..utils.species_utils import get_species_full_name
+from ..core.utils import run_render
 from .search_patch import search_orthologues_patched
-from .gene_finder import build_gene_to_orthogroup_map, find_gene_orthogroup as find_gene_in_orthogroup_lookup
+from .gene_finder import build_gene_to_orthogroup_map, count_genes_by_species, find_gene_orthogroup as find_gene_in_orthogroup_lookup
 from app.data_access.orthogroups_repository import OrthogroupsRepository
 from ..core.monitoring import monitor_performance, track_memory_usage
 
+# PyArrow gives a multi-threaded CSV parser for the large orthogroups table
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 # ETE3 imports
 try:
     from ete3 import Tree, TreeStyle, NodeStyle
@@ -40,6 +59,8 @@ DATA_DIR = os.path.join(BASE_DIR, "data/orthofinder")
 TREE_FILE = os.path.join(DATA_DIR, "SpeciesTree_nameSp_completeGenome110124.tree")
 ORTHOGROUPS_FILE = os.path.join(DATA_DIR, "Orthogroups_clean_121124.txt")  # Using the full dataset instead of sample
 SPECIES_MAPPING_FILE = os.path.join(DATA_DIR, "Table_S1_Metadata_angiosperm_species.csv")
+TREE_IMAGE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "orthoviewer_tree_images")
+TREE_IMAGE_CACHE_SIZE = 64  # PNGs kept on disk; the least recently used go first
 
 # Global variables
 _orthogroups_data = None
@@ -47,169 +68,367 @@ _species_mapping = None
 _species_tree = None
 _ete_tree = None  # ETE tree cache
 _gene_map = {}  # Cache for gene-to-orthogroup mapping
+_gene_map_complete = False  # True once _gene_map indexes every cell of _orthogroups_data
+_orthogroup_rows = {}  # Orthogroup ID -> row position in _orthogroups_data
+_gene_counts_by_species = None  # Species column -> gene total, computed on first use
 _leaf_node_cache = {}  # Cache for leaf nodes by species code
+_leaf_search_index = []  # (leaf, full_name, leaf_name_lower, full_name_lower) per leaf
+_fullname_to_leaf = {}  # Lowercased full species name -> leaf, in leaf order
+_fullname_haystack = ""  # The _fullname_to_leaf names joined by newlines, for one-pass substring search
+_fullname_starts = []  # Offset of each name in _fullname_haystack
+_fullname_leaves = []  # Leaf for each name, same order
+_leaf_fuzzy_names = []  # (species_code, lowercased) for codes of 3+ chars, in _leaf_node_cache order
+_leaf_prefix_first = {}  # Lowercased 3-char prefix -> position of its first code in _leaf_fuzzy_names
+_clade_spans = {}  # Node -> (start, stop) of its leaves in the per-leaf arrays below
+_clade_leaf_names = []  # Full species name per leaf, in preorder leaf order
+_clade_leaf_names_lower = []
+_clade_search_strings = {}  # Node -> its leaves' lowercased names joined by spaces
+_clade_gene_prefix = [0]  # Running gene_count total over the same leaf order
+
+# Loaders run in worker threads; each lock makes concurrent first calls share one load
+_orthogroups_lock = threading.Lock()
+_species_mapping_lock = threading.Lock()
+_ete_tree_lock = threading.Lock()
+_gene_counts_lock = threading.Lock()
 
 repo = OrthogroupsRepository()
 
+def _read_orthogroups_arrow(sep: str) -> pd.DataFrame:
+    """Parse the orthogroups table with PyArrow, keeping every column as text
+
+    Mirrors ``read_csv(dtype=str, na_filter=False)``: empty cells stay empty strings.
+    Columns stay Arrow-backed (``string[pyarrow]``) rather than being turned into
+    one Python object per cell, which older pandas versions do by default.
+    """
+    columns = pd.read_csv(ORTHOGROUPS_FILE, sep=sep, nrows=0).columns
+    table = pacsv.read_csv(
+        ORTHOGROUPS_FILE,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=8 << 20),
+        parse_options=pacsv.ParseOptions(delimiter=sep),
+        convert_options=pacsv.ConvertOptions(
+            column_types={col: pa.string() for col in columns},
+            strings_can_be_null=False
+        )
+    )
+    return table.to_pandas(
+        split_blocks=True,
+        self_destruct=True,
+        types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get
+    )
+
+def _orthogroups_sidecar(kind: str, ext: str) -> Optional[str]:
+    """Path for a file derived from ORTHOGROUPS_FILE, named after the TSV's mtime and size
+
+    An edited or replaced TSV gets a new name, so stale derived files are never read.
+    """
+    try:
+        st = os.stat(ORTHOGROUPS_FILE)
+    except OSError:
+        return None
+    return f"{ORTHOGROUPS_FILE}.{kind}.{st.st_mtime_ns}-{st.st_size}.{ext}"
+
+def _write_sidecar(path: str, write: Callable[[str], None]):
+    """Have ``write`` fill a temporary file next to ``path``, then move it into place
+
+    A concurrent loader or a crash mid-write leaves either no sidecar or a
+    complete one, never a truncated file for every later cold start to reject.
+    """
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp", delete=False
+    ) as tmp:
+        tmp_path = tmp.name
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _prune_sidecars(kind: str, ext: str, current: str):
+    """Delete the ``kind`` sidecars left by earlier versions of ORTHOGROUPS_FILE"""
+    for path in glob.glob(f"{glob.escape(ORTHOGROUPS_FILE)}.{kind}.*.{ext}"):
+        if path != current:
+            try:
+                os.remove(path)
+                logger.info(f"Removed stale cache {path}")
+            except OSError as e:
+                logger.warning(f"Could not remove stale cache {path}: {str(e)}")
+
+def _read_orthogroups_table(sep: str) -> pd.DataFrame:
+    """Read the orthogroups table, from its Parquet sidecar when one is current
+
+    The first parse of the TSV writes the sidecar; later cold starts load the
+    columnar copy instead of tokenizing the text again.
+    """
+    parquet_path = _orthogroups_sidecar("table", "parquet") if HAS_PYARROW else None
+    if parquet_path and os.path.exists(parquet_path):
+        try:
+            df = pd.read_parquet(parquet_path, engine="pyarrow")
+            logger.info(f"Orthogroups data loaded from cache {parquet_path}")
+            return df
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable Parquet cache {parquet_path}: {str(e)}")
+    
+    if HAS_PYARROW:
+        df = _read_orthogroups_arrow(sep)
+    else:
+        df = pd.read_csv(
+            ORTHOGROUPS_FILE,
+            sep=sep,
+            low_memory=False,
+            dtype=str,  # Treat all columns as strings
+            na_filter=False  # Don't convert empty strings to NaN
+        )
+    
+    if parquet_path:
+        try:
+            _write_sidecar(
+                parquet_path,
+                lambda tmp_path: df.to_parquet(tmp_path, engine="pyarrow", compression="zstd", index=False)
+            )
+            _prune_sidecars("table", "parquet", parquet_path)
+        except Exception as e:
+            logger.warning(f"Could not write Parquet cache {parquet_path}: {str(e)}")
+    return df
+
+def _orthogroups_columns() -> List[str]:
+    """Header of the orthogroups table, kept in a small JSON sidecar"""
+    # A warm server already holds the parsed table
+    df = _orthogroups_data
+    if df is not None:
+        return df.columns.tolist()
+    
+    columns_path = _orthogroups_sidecar("columns", "json")
+    if columns_path and os.path.exists(columns_path):
+        try:
+            with open(columns_path, 'r') as f:
+                return json.load(f)["columns"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable column cache {columns_path}: {str(e)}")
+    
+    columns = pd.read_csv(ORTHOGROUPS_FILE, sep='\t', nrows=0).columns.tolist()
+    if columns_path:
+        def write_columns(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump({"columns": columns}, f)
+        try:
+            _write_sidecar(columns_path, write_columns)
+            _prune_sidecars("columns", "json", columns_path)
+        except OSError as e:
+            logger.warning(f"Could not write column cache {columns_path}: {str(e)}")
+    return columns
+
+def _load_gene_map(df: pd.DataFrame) -> Dict[str, str]:
+    """Gene to orthogroup map for the orthogroups table, reused from a pickle next to it
+
+    The pickle name carries the TSV's mtime and size, so an edited file is re-indexed.
+    Unpickling can run arbitrary code, so the directory holding ORTHOGROUPS_FILE
+    must only be writable by users trusted to run code in this server.
+    """
+    cache_path = _orthogroups_sidecar("genemap", "pkl")
+    
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                gene_map = pickle.load(f)
+            # Older caches also held a gene-to-species index next to the map
+            if not isinstance(gene_map, dict):
+                raise ValueError(f"unexpected cache content {type(gene_map).__name__}")
+            logger.info(f"Gene mapping loaded from cache {cache_path}")
+            return gene_map
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable gene mapping cache {cache_path}: {str(e)}")
+    
+    gene_map = build_gene_to_orthogroup_map(df)
+    if cache_path and gene_map:
+        def write_gene_map(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(gene_map, f, protocol=5)
+        try:
+            _write_sidecar(cache_path, write_gene_map)
+            _prune_sidecars("genemap", "pkl", cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write gene mapping cache {cache_path}: {str(e)}")
+    return gene_map
+
 def load_orthogroups_data():
     """Load orthogroups data from CSV file"""
     global _orthogroups_data
     global _gene_map
+    global _orthogroup_rows
+    global _gene_counts_by_species
+    global _gene_map_complete
 
-    if _orthogroups_data is None:
-        try:
-            logger.info(f"Loading orthogroups data from {ORTHOGROUPS_FILE}")
-            # Use appropriate separator and optimize pandas read
-            sep = '\t' if ORTHOGROUPS_FILE.endswith('.tsv') or ORTHOGROUPS_FILE.endswith('.txt') else ','
-            _orthogroups_data = pd.read_csv(
-                ORTHOGROUPS_FILE,
-                sep=sep,
-                low_memory=False,
-                dtype=str,  # Treat all columns as strings
-                na_filter=False  # Don't convert empty strings to NaN
-            )
-            logger.info(f"Orthogroups data loaded successfully: {_orthogroups_data.shape}")
+    # Fast path without the lock once loaded; the lock makes concurrent cold
+    # requests (each in its own worker thread) wait for a single load
+    if _orthogroups_data is not None:
+        return _orthogroups_data
+    with _orthogroups_lock:
+        if _orthogroups_data is None:
+            try:
+                logger.info(f"Loading orthogroups data from {ORTHOGROUPS_FILE}")
+                # Use appropriate separator and optimize pandas read
+                sep = '\t' if ORTHOGROUPS_FILE.endswith('.tsv') or ORTHOGROUPS_FILE.endswith('.txt') else ','
+                df = _read_orthogroups_table(sep)
+                logger.info(f"Orthogroups data loaded successfully: {df.shape}")
             
-            # Log basic info
-            logger.info(f"Columns: {_orthogroups_data.columns.tolist()}")
-            logger.info(f"Sample: \n{_orthogroups_data.head(2)}")
+                # Log basic info
+                logger.info(f"Columns: {df.columns.tolist()}")
+                logger.info(f"Sample: \n{df.head(2)}")
 
-            # Build gene-to-orthogroup mapping for faster lookups
-            _gene_map = build_gene_to_orthogroup_map(_orthogroups_data)
-            logger.info(f"Gene mapping built with {len(_gene_map)} entries")
+                # Row of each orthogroup ID; the first row wins for a repeated ID,
+                # as with the boolean-mask lookup this replaces
+                _orthogroup_rows = {}
+                for position, orthogroup_id in enumerate(df.iloc[:, 0]):
+                    _orthogroup_rows.setdefault(orthogroup_id, position)
+                _gene_counts_by_species = None
 
-        except Exception as e:
-            logger.error(f"Failed to load orthogroups data: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to load orthogroups data: {str(e)}")
+                # Build gene-to-orthogroup mapping for faster lookups
+                _gene_map = _load_gene_map(df)
+                # An empty map means the build failed; lookups then keep scanning the table
+                _gene_map_complete = bool(_gene_map)
+                logger.info(f"Gene mapping built with {len(_gene_map)} entries")
+
+                # Published last: callers that skip the lock only ever see a fully built table
+                _orthogroups_data = df
+                # Memoized lookups were computed from the previous table
+                get_orthogroup_genes.cache_clear()
+                _cached_gene_orthogroup.cache_clear()
+                _cached_tree_search.cache_clear()
+                _attach_gene_counts()
+
+            except Exception as e:
+                logger.error(f"Failed to load orthogroups data: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to load orthogroups data: {str(e)}")
     return _orthogroups_data
 
+# Genus guessed for unmapped species codes, keyed by the code's first letter
+_FALLBACK_GENUS = {
+    'A': 'Arabidopsis', 'B': 'Brassica', 'C': 'Citrus', 'D': 'Daucus',
+    'E': 'Eucalyptus', 'F': 'Fragaria', 'G': 'Glycine', 'H': 'Helianthus',
+    'L': 'Lotus', 'M': 'Medicago', 'N': 'Nicotiana', 'O': 'Oryza',
+    'P': 'Populus', 'Q': 'Quercus', 'R': 'Ricinus', 'S': 'Solanum',
+    'T': 'Triticum', 'V': 'Vigna', 'W': 'Wheat line', 'Z': 'Zea',
+}
+
 def generate_fallback_name(species_code):
     """Generate a reasonable fallback name for unmapped species codes"""
-    # Common genus mappings based on typical patterns
-    genus_hints = {
-        'A': ['Arabidopsis', 'Aegilops', 'Actinidia', 'Amaranthus', 'Acorus'],
-        'B': ['Brassica', 'Beta', 'Bambusa'],
-        'C': ['Citrus', 'Cannabis', 'Cucumis', 'Coffea', 'Camelina', 'Capsella'],
-        'D': ['Daucus'],
-        'E': ['Eucalyptus'],
-        'F': ['Fragaria'],
-        'G': ['Glycine', 'Gossypium'],
-        'H': ['Helianthus', 'Hordeum'],
-        'L': ['Lotus', 'Lupinus', 'Lactuca', 'Linum'],
-        'M': ['Medicago', 'Malus', 'Musa', 'Manihot'],
-        'N': ['Nicotiana', 'Nelumbo'],
-        'O': ['Oryza', 'Olea'],
-        'P': ['Populus', 'Pisum', 'Prunus', 'Panicum', 'Phaseolus'],
-        'Q': ['Quercus'],
-        'R': ['Ricinus'],
-        'S': ['Solanum', 'Sorghum', 'Setaria', 'Sesamum'],
-        'T': ['Triticum', 'Theobroma', 'Trifolium'],
-        'V': ['Vigna', 'Vitis'],
-        'W': ['Wheat line'],
-        'Z': ['Zea']
-    }
-    
-    if len(species_code) >= 1:
-        first_letter = species_code[0].upper()
-        if first_letter in genus_hints:
-            possible_genera = genus_hints[first_letter]
-            # Use the first genus as a reasonable guess
-            return f"{possible_genera[0]} sp. ({species_code})"
-    
-    # Ultimate fallback
+    genus = _FALLBACK_GENUS.get(species_code[:1].upper())
+    if genus:
+        return f"{genus} sp. ({species_code})"
     return f"Species {species_code}"
 
 def get_species_full_name_enhanced(species_code, species_mapping):
     """Get species full name with enhanced fallback strategies"""
-    # Try different mapping strategies
-    for mapping_key in ['id_to_full', 'prefix_to_full', 'newick_to_full']:
-        if species_code in species_mapping.get(mapping_key, {}):
-            return species_mapping[mapping_key][species_code]
+    # id_to_full, prefix_to_full and newick_to_full are one shared dict
+    full_name = species_mapping.get('id_to_full', {}).get(species_code)
+    if full_name is not None:
+        return full_name
     
     # Final fallback
     return generate_fallback_name(species_code)
 
+@lru_cache(maxsize=2)
+def _read_species_mapping_table(path: str, mtime: float) -> pd.DataFrame:
+    """Parsed species metadata table; shared and read-only, re-read when the file changes
+
+    Only the species name and ID columns (the first two) are parsed.
+    """
+    # Load mapping file: skip header (first 2 lines), use tab separator
+    return pd.read_csv(path, sep='\t', skiprows=2, usecols=[0, 1])
+
+def _species_mapping_table() -> pd.DataFrame:
+    return _read_species_mapping_table(SPECIES_MAPPING_FILE, os.path.getmtime(SPECIES_MAPPING_FILE))
+
 def load_species_mapping():
     """Load species mapping with correct file format handling"""
     global _species_mapping
-    if _species_mapping is None:
-        try:
-            logger.info(f"Loading species mapping from {SPECIES_MAPPING_FILE}")
+    if _species_mapping is not None:
+        return _species_mapping
+    with _species_mapping_lock:
+        if _species_mapping is None:
+            try:
+                logger.info(f"Loading species mapping from {SPECIES_MAPPING_FILE}")
             
-            # Load mapping file: skip header (first 2 lines), use tab separator
-            mapping_df = pd.read_csv(SPECIES_MAPPING_FILE, sep='\t', skiprows=2)
-            logger.info(f"Species mapping loaded successfully: {mapping_df.shape}")
-            logger.info(f"Mapping columns: {mapping_df.columns.tolist()}")
+                mapping_df = _species_mapping_table()
+                logger.info("Species mapping loaded successfully: %s", mapping_df.shape)
             
-            # Column structure: [Full_Species_Name, Species_ID, Annotation, ...]
-            # We want: Species_ID -> Full_Species_Name
-            species_full_col = mapping_df.columns[0]  # Full species name (e.g., "Acorus tatarinowii")
-            species_id_col = mapping_df.columns[1]    # Species ID (e.g., "Ata")
+                # Column structure: [Full_Species_Name, Species_ID]
+                # We want: Species_ID -> Full_Species_Name
+                species_full_col = mapping_df.columns[0]  # Full species name (e.g., "Acorus tatarinowii")
+                species_id_col = mapping_df.columns[1]    # Species ID (e.g., "Ata")
             
-            logger.info(f"Using mapping: '{species_id_col}' -> '{species_full_col}'")
+                logger.debug("Using mapping: '%s' -> '%s'", species_id_col, species_full_col)
             
-            # Create basic mapping: ID -> Full Name
-            id_to_full = dict(zip(mapping_df[species_id_col], mapping_df[species_full_col]))
-            full_to_id = dict(zip(mapping_df[species_full_col], mapping_df[species_id_col]))
+                # Create basic mapping: ID -> Full Name
+                id_to_full = dict(zip(mapping_df[species_id_col], mapping_df[species_full_col]))
+                full_to_id = dict(zip(mapping_df[species_full_col], mapping_df[species_id_col]))
             
-            # Load orthogroups to see what species we actually need to map
-            ortho_df = pd.read_csv(ORTHOGROUPS_FILE, sep='\t', low_memory=False)
-            ortho_species = set(ortho_df.columns[1:])
+                # Only the header is needed to see which species we have to map
+                ortho_species = set(_orthogroups_columns()[1:])
             
-            # Enhanced mapping with fallbacks for missing species
-            enhanced_mapping = id_to_full.copy()
+                # Enhanced mapping with fallbacks for missing species
+                enhanced_mapping = id_to_full.copy()
             
-            # Find missing species and create fallback mappings
-            missing_species = ortho_species - set(id_to_full.keys())
-            logger.info(f"Found {len(missing_species)} species needing fallback mapping")
+                # Find missing species and create fallback mappings
+                missing_species = ortho_species - set(id_to_full.keys())
+                logger.info(f"Found {len(missing_species)} species needing fallback mapping")
             
-            for missing_code in missing_species:
-                # Strategy 1: Look for partial matches in existing mappings
-                found_match = False
+                # Mapped IDs grouped by lowercased 2-letter prefix, in mapping order,
+                # so each missing code only looks at IDs that can match it
+                prefix_index = {}
                 for mapped_id, full_name in id_to_full.items():
-                    # Check if missing code is similar to mapped ID (first 2-3 letters match)
-                    if (len(missing_code) >= 2 and len(mapped_id) >= 2 and
-                        missing_code.lower()[:2] == mapped_id.lower()[:2] and 
-                        abs(len(missing_code) - len(mapped_id)) <= 2):
-                        enhanced_mapping[missing_code] = f"{full_name} (variant {missing_code})"
-                        found_match = True
-                        logger.info(f"Partial match found: '{missing_code}' -> '{enhanced_mapping[missing_code]}'")
-                        break
+                    if isinstance(mapped_id, str) and len(mapped_id) >= 2:
+                        prefix_index.setdefault(mapped_id.lower()[:2], []).append((mapped_id, full_name))
+
+                for missing_code in missing_species:
+                    # Strategy 1: Look for partial matches in existing mappings
+                    found_match = False
+                    candidates = prefix_index.get(missing_code.lower()[:2], []) if len(missing_code) >= 2 else []
+                    for mapped_id, full_name in candidates:
+                        # Check if missing code is similar to mapped ID (first 2-3 letters match)
+                        if abs(len(missing_code) - len(mapped_id)) <= 2:
+                            enhanced_mapping[missing_code] = f"{full_name} (variant {missing_code})"
+                            found_match = True
+                            logger.info("Partial match found: '%s' -> '%s'", missing_code, enhanced_mapping[missing_code])
+                            break
                 
-                # Strategy 2: Generate reasonable fallback names
-                if not found_match:
-                    fallback_name = generate_fallback_name(missing_code)
-                    enhanced_mapping[missing_code] = fallback_name
-                    logger.info(f"Fallback mapping created: '{missing_code}' -> '{fallback_name}'")
+                    # Strategy 2: Generate reasonable fallback names
+                    if not found_match:
+                        fallback_name = generate_fallback_name(missing_code)
+                        enhanced_mapping[missing_code] = fallback_name
+                        logger.info("Fallback mapping created: '%s' -> '%s'", missing_code, fallback_name)
             
-            # Create all mapping dictionaries
-            _species_mapping = {
-                'newick_to_full': enhanced_mapping.copy(),
-                'full_to_newick': full_to_id.copy(),
-                'id_to_full': enhanced_mapping.copy(),
-                'full_to_id': full_to_id.copy(),
-                'prefix_to_full': enhanced_mapping.copy()
-            }
+                # Create all mapping dictionaries
+                # The lookup keys all describe the same two tables and are only
+                # read, so they share one dict each instead of holding copies
+                _species_mapping = {
+                    'newick_to_full': enhanced_mapping,
+                    'full_to_newick': full_to_id,
+                    'id_to_full': enhanced_mapping,
+                    'full_to_id': full_to_id,
+                    'prefix_to_full': enhanced_mapping
+                }
             
-            # Log mapping success
-            mapped_count = len(set(enhanced_mapping.keys()) & ortho_species)
-            logger.info(f"Species mapping complete: {mapped_count}/{len(ortho_species)} species mapped ({mapped_count/len(ortho_species)*100:.1f}%)")
+                # Log mapping success
+                mapped_count = len(set(enhanced_mapping.keys()) & ortho_species)
+                logger.info(f"Species mapping complete: {mapped_count}/{len(ortho_species)} species mapped ({mapped_count/len(ortho_species)*100:.1f}%)")
             
-            # Log some sample mappings
-            sample_mappings = list(enhanced_mapping.items())[:5]
-            for code, name in sample_mappings:
-                logger.info(f"Sample mapping: '{code}' -> '{name}'")
+                # Log some sample mappings
+                for code, name in islice(enhanced_mapping.items(), 5):
+                    logger.info("Sample mapping: '%s' -> '%s'", code, name)
                 
-        except Exception as e:
-            logger.error(f"Failed to load species mapping: {str(e)}")
-            # Create minimal fallback mapping
-            _species_mapping = {
-                'newick_to_full': {},
-                'full_to_newick': {},
-                'id_to_full': {},
-                'full_to_id': {},
-                'prefix_to_full': {}
-            }
+            except Exception as e:
+                logger.error(f"Failed to load species mapping: {str(e)}")
+                # Create minimal fallback mapping
+                _species_mapping = {
+                    'newick_to_full': {},
+                    'full_to_newick': {},
+                    'id_to_full': {},
+                    'full_to_id': {},
+                    'prefix_to_full': {}
+                }
+            _cached_tree_search.cache_clear()
     return _species_mapping
 
 def load_species_tree():
@@ -227,6 +446,22 @@ def load_species_tree():
             _species_tree = "(A:0.1,B:0.2);"
     return _species_tree
 
+@lru_cache(maxsize=4)
+def _tree_response_body(newick: str) -> bytes:
+    """JSON body for ``/tree``, serialized once per species tree and reused as-is"""
+    # Same encoding FastAPI's JSONResponse would produce for this dict
+    return json.dumps(
+        {"success": True, "newick": newick}, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+def get_gene_counts_by_species() -> Dict[str, int]:
+    """Gene totals per species column, counted once per loaded orthogroups table"""
+    global _gene_counts_by_species
+    df = load_orthogroups_data()
+    if _gene_counts_by_species is None:
+        _gene_counts_by_species = count_genes_by_species(df)
+    return _gene_counts_by_species
+
 # =============================================================================
 # ETE3 TOOLKIT FUNCTIONS
 # =============================================================================
@@ -235,100 +470,196 @@ def load_ete_tree() -> Tree:
     """Load the ETE tree from file"""
     global _ete_tree
     global _leaf_node_cache
+    global _leaf_search_index
+    global _fullname_to_leaf
+    global _fullname_haystack
+    global _fullname_starts
+    global _fullname_leaves
+    global _leaf_fuzzy_names
+    global _leaf_prefix_first
+    global _clade_spans
+    global _clade_leaf_names
+    global _clade_leaf_names_lower
+    global _clade_search_strings
+    global _clade_gene_prefix
     
-    if _ete_tree is None:
-        try:
-            logger.info(f"Loading ETE tree from {TREE_FILE}")
-            _ete_tree = Tree(TREE_FILE, format=1)
+    if _ete_tree is not None:
+        return _ete_tree
+    with _ete_tree_lock:
+        if _ete_tree is None:
+            try:
+                logger.info(f"Loading ETE tree from {TREE_FILE}")
+                tree = Tree(TREE_FILE, format=1)
+            
+                # The topology never changes once loaded, so root distances are
+                # computed in one preorder pass instead of per search result
+                for node in tree.traverse("preorder"):
+                    node.add_feature("dist_to_root", 0.0 if node.up is None else node.up.dist_to_root + node.dist)
             
-            # Build leaf node cache
-            _leaf_node_cache = {}
-            for leaf in _ete_tree.get_leaves():
-                species_code = leaf.name.strip().strip('"\'')
-                _leaf_node_cache[species_code] = leaf
+                # Build leaf node cache and the lowercased names species search matches on
+                _leaf_node_cache = {}
+                _leaf_search_index = []
+                _fullname_to_leaf = {}
+                _clade_leaf_names = []
+                _clade_leaf_names_lower = []
+                for leaf in tree.get_leaves():
+                    species_code = leaf.name.strip().strip('"\'')
+                    _leaf_node_cache[species_code] = leaf
+                    full_name = getattr(leaf, "full_species_name", species_code)
+                    _leaf_search_index.append((leaf, full_name, species_code.lower(), full_name.lower()))
+                    _fullname_to_leaf.setdefault(full_name.lower(), leaf)
+                    clade_name = getattr(leaf, "full_species_name", leaf.name)
+                    _clade_leaf_names.append(clade_name)
+                    _clade_leaf_names_lower.append(clade_name.lower())
+                # Gene totals stay zero until _attach_gene_counts fills them in
+                _clade_gene_prefix = [0] * (len(_clade_leaf_names) + 1)
+            
+                # All full names in one string: the first leaf whose name contains a
+                # query is found by a single str.find instead of a loop over names
+                _fullname_haystack = "\n".join(_fullname_to_leaf)
+                _fullname_starts = []
+                offset = 0
+                for name in _fullname_to_leaf:
+                    _fullname_starts.append(offset)
+                    offset += len(name) + 1
+                _fullname_leaves = list(_fullname_to_leaf.values())
+            
+                # Lowercased codes for fuzzy matching of species the tree does not name
+                _leaf_fuzzy_names = [(code, code.lower()) for code in _leaf_node_cache if len(code) >= 3]
+                _leaf_prefix_first = {}
+                for position, (_, code_lower) in enumerate(_leaf_fuzzy_names):
+                    _leaf_prefix_first.setdefault(code_lower[:3], position)
+            
+                # Leaves of any clade are contiguous in that order, so each node
+                # is reduced to a span instead of re-walking get_leaves() per search
+                # The joined string clade search matches against is built bottom-up too
+                _clade_spans = {}
+                _clade_search_strings = {}
+                position = 0
+                for node in tree.traverse("postorder"):
+                    if node.is_leaf():
+                        _clade_spans[node] = (position, position + 1)
+                        _clade_search_strings[node] = _clade_leaf_names_lower[position]
+                        position += 1
+                    else:
+                        _clade_spans[node] = (_clade_spans[node.children[0]][0], _clade_spans[node.children[-1]][1])
+                        _clade_search_strings[node] = " ".join(_clade_search_strings[child] for child in node.children)
                 
-            logger.info("ETE tree loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load ETE tree: {str(e)}")
-            raise
+                # Published last, once every index above is complete
+                _ete_tree = tree
+                _cached_tree_search.cache_clear()
+                logger.info("ETE tree loaded successfully")
+                _attach_gene_counts()
+            except Exception as e:
+                logger.error(f"Failed to load ETE tree: {str(e)}")
+                raise
     return _ete_tree
 
+def _attach_gene_counts():
+    """Give the ETE tree's leaves their gene totals once the orthogroups table is loaded
+
+    load_ete_tree and load_orthogroups_data both call this after publishing,
+    so whichever finishes second attaches the counts; the tree itself never
+    waits for the table. Until then leaves report zero genes.
+    """
+    global _clade_gene_prefix
+    tree = _ete_tree
+    if tree is None or _orthogroups_data is None:
+        return
+    with _gene_counts_lock:
+        try:
+            gene_counts = get_gene_counts_by_species()
+            full_to_id = load_species_mapping().get('full_to_id', {})
+        except Exception as e:
+            logger.warning(f"Gene counts unavailable for ETE tree: {str(e)}")
+            return
+        gene_prefix = [0]
+        for leaf in tree.get_leaves():
+            species_code = leaf.name.strip().strip('"\'')
+            # Leaves may be named by column ID or by full species name
+            column = species_code if species_code in gene_counts else full_to_id.get(species_code)
+            leaf.add_feature("gene_count", gene_counts.get(column, 0))
+            gene_prefix.append(gene_prefix[-1] + leaf.gene_count)
+        _clade_gene_prefix = gene_prefix
+        # Styles and image keys were derived from the previous counts
+        _tree_styles.pop(tree, None)
+        _tree_digests.pop(tree, None)
+        _cached_tree_search.cache_clear()
+
+def _fuzzy_leaf_code(species_code: str) -> Optional[str]:
+    """First tree species code sharing a 3-char prefix with ``species_code``
+    or containing / contained in it, case-insensitively
+
+    The first code with the same prefix is found by lookup, so only the codes
+    before it are checked for containment.
+    """
+    if len(species_code) < 3:
+        return None
+    code_lower = species_code.lower()
+    first_prefix = _leaf_prefix_first.get(code_lower[:3], len(_leaf_fuzzy_names))
+    for tree_species, tree_lower in _leaf_fuzzy_names[:first_prefix]:
+        if code_lower in tree_lower or tree_lower in code_lower:
+            return tree_species
+    if first_prefix < len(_leaf_fuzzy_names):
+        return _leaf_fuzzy_names[first_prefix][0]
+    return None
+
 def search_tree_by_gene(gene_id: str, max_results: int = 50) -> List[ETESearchResult]:
     """Search for species containing a specific gene"""
-    results = []
     tree = load_ete_tree()  # This will also initialize the leaf node cache
-    ortho_data = load_orthogroups_data()
+    load_orthogroups_data()
     species_mapping = load_species_mapping()
     
     # First try to find the orthogroup containing this gene
-    orthogroup_id = find_gene_orthogroup(gene_id, _gene_map, ortho_data)
-    logger.info(f"Searching for gene {gene_id}, found in orthogroup: {orthogroup_id}")
-    
-    # Find species with the gene
-    species_with_gene = []
-    if orthogroup_id:
-        # Get all genes in this orthogroup
-        genes_by_species = get_orthogroup_genes(orthogroup_id)
-        species_with_gene = list(genes_by_species.keys())
-    else:
-        # Fallback: direct search
-        for col in ortho_data.columns[1:]:
-            mask = ortho_data[col].astype(str).str.contains(gene_id, na=False)
-            if mask.any():
-                species_with_gene.append(col)
+    orthogroup_id = _cached_gene_orthogroup(gene_id)
+    logger.info("Searching for gene %s, found in orthogroup: %s", gene_id, orthogroup_id)
+    
+    # Find species with the gene: those listed in its orthogroup. The lookup
+    # above already scans the table when the gene map is incomplete, so a gene
+    # without an orthogroup is listed by no species
+    genes_by_species = get_orthogroup_genes(orthogroup_id) if orthogroup_id else {}
+    species_with_gene = list(genes_by_species)
     
     # DEBUG: Log what we found
-    logger.info(f"Found gene {gene_id} in species: {species_with_gene}")
-    logger.info(f"Available leaf nodes in tree: {list(_leaf_node_cache.keys())[:10]}")  # First 10
-    
-    # Check for matches and mismatches
-    matched_species = []
-    unmatched_species = []
-    
-    for species_code in species_with_gene:
-        # Try direct match first
-        if species_code in _leaf_node_cache:
-            matched_species.append(species_code)
-            leaf = _leaf_node_cache[species_code]
-            result = ETESearchResult(
-                node_name=getattr(leaf, "full_species_name", leaf.name),
-                node_type="leaf",
-                distance_to_root=leaf.get_distance(tree),
-                gene_count=len(genes_by_species[species_code]) if orthogroup_id else 1,
-                species_count=1,
-                clade_members=[getattr(leaf, "full_species_name", leaf.name)]
-            )
-            results.append(result)
-        else:
-            unmatched_species.append(species_code)
+    logger.info("Found gene %s in species: %s", gene_id, species_with_gene)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Available leaf nodes in tree: %s", list(_leaf_node_cache.keys())[:10])  # First 10
+    
+    # Check for matches and mismatches: direct leaf matches first
+    leaf_cache = _leaf_node_cache
+    matched_leaves = [(code, leaf_cache[code]) for code in species_with_gene if code in leaf_cache]
+    matched_species = [code for code, _ in matched_leaves]
+    unmatched_species = [code for code in species_with_gene if code not in leaf_cache]
+    
+    results = [
+        ETESearchResult(
+            node_name=getattr(leaf, "full_species_name", leaf.name),
+            node_type="leaf",
+            distance_to_root=getattr(leaf, "dist_to_root", 0.0),
+            gene_count=len(genes_by_species[species_code]),
+            species_count=1,
+            clade_members=[getattr(leaf, "full_species_name", leaf.name)]
+        )
+        for species_code, leaf in matched_leaves
+    ]
     
     # DEBUG: Log the mismatch issue
-    logger.warning(f"Species matched in tree: {matched_species}")
-    logger.warning(f"Species NOT found in tree: {unmatched_species}")
+    logger.warning("Species matched in tree: %s", matched_species)
+    logger.warning("Species NOT found in tree: %s", unmatched_species)
     
     # Try to match unmatched species using species mapping
     for unmatched in unmatched_species:
         # Try mapping strategies
-        mapped_name = None
-        
-        # 1. Try species mapping from metadata file
-        for mapping_key in ['id_to_full', 'prefix_to_full', 'newick_to_full']:
-            if unmatched in species_mapping.get(mapping_key, {}):
-                mapped_name = species_mapping[mapping_key][unmatched]
-                logger.info(f"Found mapping for {unmatched} -> {mapped_name}")
-                break
+        # 1. Try species mapping from metadata file (all its ID keys share one dict)
+        mapped_name = species_mapping.get('id_to_full', {}).get(unmatched)
+        if mapped_name is not None:
+            logger.info("Found mapping for %s -> %s", unmatched, mapped_name)
         
         # 2. If no mapping found, try fuzzy matching
         if not mapped_name:
-            for tree_species in _leaf_node_cache.keys():
-                # Try different matching strategies
-                if (len(unmatched) >= 3 and len(tree_species) >= 3 and 
-                    (unmatched[:3].lower() == tree_species[:3].lower() or  # First 3 chars match
-                     unmatched.lower() in tree_species.lower() or          # One contains the other
-                     tree_species.lower() in unmatched.lower())):
-                    mapped_name = tree_species
-                    logger.info(f"Fuzzy match found: {unmatched} -> {tree_species}")
-                    break
+            mapped_name = _fuzzy_leaf_code(unmatched)
+            if mapped_name:
+                logger.info("Fuzzy match found: %s -> %s", unmatched, mapped_name)
         
         # If we found a mapping, create a result
         if mapped_name and mapped_name in _leaf_node_cache:
@@ -336,8 +667,8 @@ def search_tree_by_gene(gene_id: str, max_results: int = 50) -> List[ETESearchRe
             result = ETESearchResult(
                 node_name=f"{getattr(leaf, 'full_species_name', leaf.name)} (mapped from {unmatched})",
                 node_type="leaf",
-                distance_to_root=leaf.get_distance(tree),
-                gene_count=len(genes_by_species[unmatched]) if orthogroup_id else 1,
+                distance_to_root=getattr(leaf, "dist_to_root", 0.0),
+                gene_count=len(genes_by_species[unmatched]),
                 species_count=1,
                 clade_members=[getattr(leaf, "full_species_name", leaf.name)]
             )
@@ -347,8 +678,8 @@ def search_tree_by_gene(gene_id: str, max_results: int = 50) -> List[ETESearchRe
     
     # Final debug log
     if unmatched_species:
-        logger.warning(f"Still unable to match species: {unmatched_species}")
-    logger.info(f"Found {len(results)} results for gene {gene_id}")
+        logger.warning("Still unable to match species: %s", unmatched_species)
+    logger.info("Found %d results for gene %s", len(results), gene_id)
     
     return results
 
@@ -360,27 +691,24 @@ def search_tree_by_species(species_query: str, max_results: int = 50) -> List[ET
     
     query_lower = species_query.lower()
     
-    for leaf in tree.get_leaves():
-        leaf_name = leaf.name.strip().strip('"\'')
-        full_name = getattr(leaf, "full_species_name", leaf_name)
-        
-        # Check if query matches species name
-        if (query_lower in leaf_name.lower() or 
-            query_lower in full_name.lower() or
-            any(query_lower in word.lower() for word in full_name.split())):
-            
-            result = ETESearchResult(
-                node_name=full_name,
-                node_type="leaf",
-                distance_to_root=leaf.get_distance(tree),
-                gene_count=getattr(leaf, "gene_count", 0),
-                species_count=1,
-                clade_members=[full_name]
-            )
-            results.append(result)
-            
-            if len(results) >= max_results:
-                break
+    # Names were lowercased once in load_ete_tree; a match inside any word of the
+    # full name is also a match inside the full name itself
+    matches = [
+        (leaf, full_name)
+        for leaf, full_name, leaf_name_lower, full_name_lower in _leaf_search_index
+        if query_lower in leaf_name_lower or query_lower in full_name_lower
+    ]
+    
+    for leaf, full_name in matches[:max_results]:
+        result = ETESearchResult(
+            node_name=full_name,
+            node_type="leaf",
+            distance_to_root=getattr(leaf, "dist_to_root", 0.0),
+            gene_count=getattr(leaf, "gene_count", 0),
+            species_count=1,
+            clade_members=[full_name]
+        )
+        results.append(result)
     
     return results
 
@@ -390,27 +718,25 @@ def search_tree_by_clade(clade_query: str, max_results: int = 50) -> List[ETESea
     tree = load_ete_tree()
     
     query_lower = clade_query.lower()
+    spans = _clade_spans
+    names = _clade_leaf_names
+    search_strings = _clade_search_strings
+    gene_prefix = _clade_gene_prefix
     
     # Search internal nodes for clades
     for node in tree.traverse():
         if not node.is_leaf():
-            # Get all species in this clade
-            clade_species = []
-            total_genes = 0
-            
-            for leaf in node.get_leaves():
-                full_name = getattr(leaf, "full_species_name", leaf.name)
-                clade_species.append(full_name)
-                total_genes += getattr(leaf, "gene_count", 0)
-            
             # Check if this clade matches the query
-            clade_string = " ".join(clade_species).lower()
-            if query_lower in clade_string:
+            if query_lower in search_strings[node]:
+                # Species in this clade, read off the precomputed leaf span
+                start, stop = spans[node]
+                clade_species = names[start:stop]
+                total_genes = gene_prefix[stop] - gene_prefix[start]
                 
                 result = ETESearchResult(
                     node_name=f"Clade with {len(clade_species)} species",
                     node_type="internal",
-                    distance_to_root=node.get_distance(tree),
+                    distance_to_root=getattr(node, "dist_to_root", 0.0),
                     support_value=getattr(node, "support", None),
                     species_count=len(clade_species),
                     gene_count=total_genes,
@@ -423,6 +749,57 @@ def search_tree_by_clade(clade_query: str, max_results: int = 50) -> List[ETESea
     
     return results
 
+# Tree search functions by search type; their results depend only on the query
+# and the loaded data, so repeated queries are served from _cached_tree_search
+_TREE_SEARCHES = {
+    "gene": search_tree_by_gene,
+    "species": search_tree_by_species,
+    "clade": search_tree_by_clade,
+}
+
+@lru_cache(maxsize=1024)
+def _cached_tree_search(search_type: str, query: str, max_results: int) -> Tuple[ETESearchResult, ...]:
+    """Memoized tree search; cleared whenever the tree, table or mapping is (re)loaded"""
+    return tuple(_TREE_SEARCHES[search_type](query, max_results))
+
+def tree_search(search_type: str, query: str, max_results: int = 50) -> List[ETESearchResult]:
+    """Run a gene, species or clade tree search, reusing results of earlier identical queries"""
+    # Make sure the data is loaded first: a (re)load clears the cache
+    load_ete_tree()
+    if search_type == "gene":
+        load_orthogroups_data()
+        load_species_mapping()
+    else:
+        # Species and clade searches match case-insensitively
+        query = query.lower()
+    return list(_cached_tree_search(search_type, query, max_results))
+
+def _common_ancestor(nodes):
+    """Deepest node whose leaf span covers the spans of two or more given nodes
+
+    Same answer as ``Tree.get_common_ancestor``, but climbs a single path
+    comparing integer spans instead of building an ancestor set per node.
+    """
+    spans = [_clade_spans[node] for node in nodes]
+    lo = min(start for start, _ in spans)
+    hi = max(stop for _, stop in spans)
+    ancestor = nodes[0]
+    start, stop = spans[0]
+    while start > lo or stop < hi:
+        ancestor = ancestor.up
+        start, stop = _clade_spans[ancestor]
+    return ancestor
+
+def _leaf_containing(query_lower: str):
+    """First leaf, in leaf order, whose lowercased full name contains ``query_lower``"""
+    if "\n" in query_lower:
+        # Could straddle two names in the haystack; no single name contains it anyway
+        return None
+    position = _fullname_haystack.find(query_lower)
+    if position < 0 or not _fullname_leaves:
+        return None
+    return _fullname_leaves[bisect.bisect_right(_fullname_starts, position) - 1]
+
 def find_common_ancestor_search(species_list: List[str]) -> List[ETESearchResult]:
     """Find common ancestor of specified species"""
     results = []
@@ -431,28 +808,25 @@ def find_common_ancestor_search(species_list: List[str]) -> List[ETESearchResult
     # Find tree nodes for each species
     target_nodes = []
     for species in species_list:
-        for leaf in tree.get_leaves():
-            full_name = getattr(leaf, "full_species_name", leaf.name)
-            if species.lower() in full_name.lower():
-                target_nodes.append(leaf)
-                break
+        # Exact name first, then the first leaf whose name contains the query
+        query_lower = species.lower()
+        leaf = _fullname_to_leaf.get(query_lower) or _leaf_containing(query_lower)
+        if leaf is not None:
+            target_nodes.append(leaf)
     
     if len(target_nodes) >= 2:
         # Find common ancestor
-        ancestor = tree.get_common_ancestor(target_nodes)
+        ancestor = _common_ancestor(target_nodes)
         
         # Get all species under this ancestor
-        descendant_species = []
-        total_genes = 0
-        for leaf in ancestor.get_leaves():
-            full_name = getattr(leaf, "full_species_name", leaf.name)
-            descendant_species.append(full_name)
-            total_genes += getattr(leaf, "gene_count", 0)
+        start, stop = _clade_spans[ancestor]
+        descendant_species = _clade_leaf_names[start:stop]
+        total_genes = _clade_gene_prefix[stop] - _clade_gene_prefix[start]
         
         result = ETESearchResult(
             node_name=f"Common ancestor of {', '.join(species_list)}",
             node_type="internal",
-            distance_to_root=ancestor.get_distance(tree),
+            distance_to_root=getattr(ancestor, "dist_to_root", 0.0),
             support_value=getattr(ancestor, "support", None),
             species_count=len(descendant_species),
             gene_count=total_genes,
@@ -462,9 +836,102 @@ def find_common_ancestor_search(species_list: List[str]) -> List[ETESearchResult
     
     return results
 
+def _tree_image_path(image_key: str) -> str:
+    return os.path.join(TREE_IMAGE_CACHE_DIR, f"{image_key}.png")
+
+def _prune_tree_images():
+    """Delete cached images beyond TREE_IMAGE_CACHE_SIZE, least recently used first"""
+    try:
+        # Renders in progress are temporary files, not yet named by their key
+        entries = [
+            entry for entry in os.scandir(TREE_IMAGE_CACHE_DIR)
+            if re.fullmatch(r"[0-9a-f]{32}\.png", entry.name)
+        ]
+        if len(entries) <= TREE_IMAGE_CACHE_SIZE:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in entries[TREE_IMAGE_CACHE_SIZE:]:
+            os.remove(entry.path)
+    except OSError as e:
+        logger.warning(f"Could not prune tree image cache: {str(e)}")
+
+# Trees rendered so far -> md5 of their Newick, so a cache hit needs no serialization
+_tree_digests = weakref.WeakKeyDictionary()
+
+def _tree_digest(tree: Tree) -> str:
+    """Digest of a tree's Newick and gene counts, computed once per tree object
+
+    Gene counts set node styles, so they are part of the digest; attaching
+    new counts drops the tree's entry.
+    """
+    digest = _tree_digests.get(tree)
+    if digest is None:
+        digest = hashlib.md5(tree.write(features=["gene_count"]).encode()).hexdigest()
+        _tree_digests[tree] = digest
+    return digest
+
+# Trees styled so far -> (nodes by name, names currently highlighted)
+_tree_styles = weakref.WeakKeyDictionary()
+_tree_render_lock = threading.Lock()
+
+def _node_style(node, highlighted: bool) -> "NodeStyle":
+    nstyle = NodeStyle()
+    if highlighted:
+        nstyle["bgcolor"] = "#ffcccc"
+        nstyle["size"] = 15
+    elif node.is_leaf():
+        if hasattr(node, "gene_count") and node.gene_count > 0:
+            nstyle["fgcolor"] = "#4caf50"
+            nstyle["size"] = max(5, min(15, node.gene_count // 100))
+        else:
+            nstyle["fgcolor"] = "#9e9e9e"
+            nstyle["size"] = 5
+    else:
+        nstyle["size"] = 3
+    return nstyle
+
+def _style_tree(tree: Tree, highlighted: set):
+    """Give the tree's nodes their styles for this highlight set
+
+    Every node is styled on a tree's first render; later renders only
+    restyle nodes whose names enter or leave the highlight set.
+    """
+    state = _tree_styles.get(tree)
+    if state is None:
+        nodes_by_name = {}
+        for node in tree.traverse():
+            nodes_by_name.setdefault(node.name, []).append(node)
+            node.set_style(_node_style(node, False))
+        state = _tree_styles[tree] = (nodes_by_name, set())
+    nodes_by_name, current = state
+    for name in current - highlighted:
+        for node in nodes_by_name.get(name, ()):
+            node.set_style(_node_style(node, False))
+    for name in highlighted - current:
+        for node in nodes_by_name.get(name, ()):
+            node.set_style(_node_style(node, True))
+    current.clear()
+    current.update(highlighted)
+
 def generate_tree_image(tree: Tree, highlighted_nodes: List[str] = None) -> str:
-    """Generate tree visualization with ETE and return as base64 string"""
+    """Render the tree with ETE to a cached PNG and return the URL serving it
+
+    Images are keyed on the tree and the highlighted nodes, so a repeated
+    search reuses the file on disk instead of rendering again.
+    """
     try:
+        image_key = hashlib.md5(
+            (_tree_digest(tree) + repr(sorted(highlighted_nodes or []))).encode()
+        ).hexdigest()
+        image_path = _tree_image_path(image_key)
+        image_url = f"{router.prefix}/tree-image/{image_key}"
+        try:
+            # A hit counts as a use, so often requested images outlive pruning
+            os.utime(image_path)
+            return image_url
+        except OSError:
+            pass  # Not rendered yet, or pruned since
+        
         # Create tree style
         ts = TreeStyle()
         ts.show_leaf_name = True
@@ -472,34 +939,22 @@ def generate_tree_image(tree: Tree, highlighted_nodes: List[str] = None) -> str:
         ts.arc_start = 0
         ts.arc_span = 360
         
-        # Style nodes
-        for node in tree.traverse():
-            nstyle = NodeStyle()
-            
-            if highlighted_nodes and node.name in highlighted_nodes:
-                nstyle["bgcolor"] = "#ffcccc"
-                nstyle["size"] = 15
-            elif node.is_leaf():
-                if hasattr(node, "gene_count") and node.gene_count > 0:
-                    nstyle["fgcolor"] = "#4caf50"
-                    nstyle["size"] = max(5, min(15, node.gene_count // 100))
-                else:
-                    nstyle["fgcolor"] = "#9e9e9e"
-                    nstyle["size"] = 5
-            else:
-                nstyle["size"] = 3
-                
-            node.set_style(nstyle)
-        
-        # Render to image
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=True) as tmp:
-            tree.render(tmp.name, tree_style=ts, w=800, h=600, dpi=150)
-            
-            # Read image and convert to base64
-            with open(tmp.name, "rb") as img_file:
-                img_data = img_file.read()
-                base64_string = base64.b64encode(img_data).decode('utf-8')
-                return f"data:image/png;base64,{base64_string}"
+        # Render next to the cache entry, then move it into place so a
+        # concurrent request never serves a half-written file
+        os.makedirs(TREE_IMAGE_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(suffix=".png", dir=TREE_IMAGE_CACHE_DIR, delete=False) as tmp:
+            tmp_path = tmp.name
+        try:
+            # Node styles live on the shared tree, so styling and rendering go together
+            with _tree_render_lock:
+                _style_tree(tree, set(highlighted_nodes or ()))
+                tree.render(tmp_path, tree_style=ts, w=800, h=600, dpi=150)
+            os.replace(tmp_path, image_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        _prune_tree_images()
+        return image_url
                 
     except Exception as e:
         logger.error(f"Failed to generate tree image: {str(e)}")
@@ -509,30 +964,61 @@ def generate_tree_image(tree: Tree, highlighted_nodes: List[str] = None) -> str:
 # ORIGINAL FUNCTIONS
 # =============================================================================
 
-def get_orthogroup_genes(orthogroup_id: str) -> Dict[str, List[str]]:
-    """Obtenir tous les gènes d'un orthogroupe, organisés par espèce"""
+@lru_cache(maxsize=4096)
+def get_orthogroup_genes(orthogroup_id: str) -> Dict[str, Tuple[str, ...]]:
+    """Obtenir tous les gènes d'un orthogroupe, organisés par espèce
+
+    Results are memoized per orthogroup and shared between callers, so they
+    must be treated as read-only.
+    """
     df = load_orthogroups_data()
     
     # Trouver la ligne avec cet ID d'orthogroupe
-    orthogroup_row = df[df[df.columns[0]] == orthogroup_id]
-    
-    if orthogroup_row.empty:
+    position = _orthogroup_rows.get(orthogroup_id)
+    if position is None:
         return {}
     
     # Extraire les gènes par espèce
     genes_by_species = {}
-    for col in df.columns[1:]:  # Ignorer la colonne ID d'orthogroupe
-        cell_value = orthogroup_row[col].iloc[0]
+    row = df.iloc[position].to_numpy()
+    for col, cell_value in zip(df.columns[1:], row[1:]):  # Ignorer la colonne ID d'orthogroupe
         if isinstance(cell_value, str) and cell_value.strip():
-            genes = [gene.strip() for gene in cell_value.split(',')]
-            genes_by_species[col] = genes
+            genes_by_species[col] = tuple(gene.strip() for gene in cell_value.split(','))
     
     return genes_by_species
 
 def find_gene_orthogroup(gene_id: str, gene_map: dict, df: pd.DataFrame) -> Optional[str]:
     """Trouver l'ID d'orthogroupe pour un gène donné"""
     # Use the optimized gene finder - FIXED: use the correct aliased function name
-    return find_gene_in_orthogroup_lookup(gene_id, gene_map, df)
+    # Unknown genes are answered from the map alone once it covers the whole table
+    complete = gene_map is _gene_map and _gene_map_complete
+    return find_gene_in_orthogroup_lookup(gene_id, gene_map, df, scan_on_miss=not complete)
+
+@lru_cache(maxsize=65536)
+def _cached_gene_orthogroup(gene_id: str) -> Optional[str]:
+    """Orthogroup of a gene in the loaded table, memoized (misses included) until the next load"""
+    return find_gene_orthogroup(gene_id, _gene_map, _orthogroups_data)
+
+def _lookup_gene_orthogroup(gene_id: str) -> Optional[str]:
+    """Load the orthogroups table if needed, then look the gene up in its map
+
+    ``_gene_map`` is read only after the load, which replaces it on a cold start.
+    """
+    load_orthogroups_data()
+    return _cached_gene_orthogroup(gene_id)
+
+async def preload_data():
+    """Load the orthogroups table, species mapping and trees in worker threads
+
+    Started as a background task at startup, so the first search does not pay
+    for parsing the table. A loader that fails here is simply retried by the
+    next request that needs its data.
+    """
+    for loader in (load_orthogroups_data, load_species_mapping, load_species_tree, load_ete_tree):
+        try:
+            await asyncio.to_thread(loader)
+        except Exception as e:
+            logger.warning(f"Preloading with {loader.__name__} failed: {str(e)}")
 
 # =============================================================================
 # API ENDPOINTS
@@ -544,46 +1030,38 @@ def find_gene_orthogroup(gene_id: str, gene_map: dict, df: pd.DataFrame) -> Opti
 async def search_orthologues(request: OrthologueSearchRequest):
     """Rechercher les orthologues d'un gène donné"""
     gene_id = request.gene_id.strip()
-    logger.info(f"Recherche des orthologues du gène: {gene_id}")
+    # Request latency is recorded by monitor_performance; per-step logging
+    # stays lazy so nothing is formatted unless its level is enabled
+    logger.info("Recherche des orthologues du gène: %s", gene_id)
     
     try:
-        # Start timing the search
-        import time
-        start_time = time.time()
-
         # Trouver à quel orthogroupe appartient le gène
-        orthogroup_id = find_gene_orthogroup(gene_id, _gene_map, load_orthogroups_data())
-
-        # Log time taken to find orthogroup
-        find_time = time.time() - start_time
-        logger.info(f"Time to find orthogroup: {find_time:.2f} seconds")
+        # Table loading and lookup are blocking pandas work; keep them off the event loop
+        orthogroup_id = await asyncio.to_thread(_lookup_gene_orthogroup, gene_id)
 
         if not orthogroup_id:
-            logger.warning(f"Gene {gene_id} not found in any orthogroup")
+            logger.warning("Gene %s not found in any orthogroup", gene_id)
             return OrthologueSearchResponse(
                 success=False,
                 gene_id=gene_id,
                 message=f"Gène {gene_id} non trouvé dans aucun orthogroupe"
             )
 
-        logger.info(f"Gène {gene_id} trouvé dans l'orthogroupe {orthogroup_id}")
+        logger.info("Gène %s trouvé dans l'orthogroupe %s", gene_id, orthogroup_id)
 
         # Obtenir tous les gènes de l'orthogroupe
-        start_time = time.time()
-        genes_by_species = get_orthogroup_genes(orthogroup_id)
-        get_genes_time = time.time() - start_time
-        logger.info(f"Time to get genes: {get_genes_time:.2f} seconds")
-
-        logger.info(f"Found {sum(len(genes) for genes in genes_by_species.values())} genes in {len(genes_by_species)} species")
+        genes_by_species = await asyncio.to_thread(get_orthogroup_genes, orthogroup_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %d genes in %d species",
+                         sum(len(genes) for genes in genes_by_species.values()), len(genes_by_species))
 
         # Charger le mapping d'espèces pour la conversion des noms
-        species_mapping = load_species_mapping()
+        species_mapping = await asyncio.to_thread(load_species_mapping)
 
         # Obtenir l'arbre des espèces
-        species_tree = load_species_tree()
+        species_tree = await asyncio.to_thread(load_species_tree)
 
         # Use our patched search function to correctly handle species names
-        start_time = time.time()
         result = await search_orthologues_patched(
             gene_id=gene_id,
             orthogroup_id=orthogroup_id,
@@ -592,12 +1070,6 @@ async def search_orthologues(request: OrthologueSearchRequest):
             species_tree=species_tree,
             load_orthogroups_data=load_orthogroups_data
         )
-        search_time = time.time() - start_time
-        logger.info(f"Time to process results: {search_time:.2f} seconds")
-
-        # Log total time
-        total_time = find_time + get_genes_time + search_time
-        logger.info(f"Total search time: {total_time:.2f} seconds")
 
         return result
     except Exception as e:
@@ -624,20 +1096,17 @@ async def ete_tree_search(request: ETESearchRequest):
         )
     
     try:
-        logger.info(f"ETE search: {request.search_type} for '{request.query}'")
+        logger.info("ETE search: %s for '%s'", request.search_type, request.query)
         
         results = []
         
-        if request.search_type == "gene":
-            results = search_tree_by_gene(request.query, request.max_results)
-        elif request.search_type == "species":
-            results = search_tree_by_species(request.query, request.max_results)
-        elif request.search_type == "clade":
-            results = search_tree_by_clade(request.query, request.max_results)
+        # Tree searches are CPU-bound, so each runs in a worker thread
+        if request.search_type in _TREE_SEARCHES:
+            results = await asyncio.to_thread(tree_search, request.search_type, request.query, request.max_results)
         elif request.search_type == "common_ancestor":
             # Parse comma-separated species list
             species_list = [s.strip() for s in request.query.split(",")]
-            results = find_common_ancestor_search(species_list)
+            results = await asyncio.to_thread(find_common_ancestor_search, species_list)
         else:
             return ETESearchResponse(
                 success=False,
@@ -653,7 +1122,7 @@ async def ete_tree_search(request: ETESearchRequest):
         if request.include_tree_image and results:
             tree = load_ete_tree()
             highlighted_nodes = [r.node_name for r in results[:5]]  # Highlight first 5 results
-            tree_image = generate_tree_image(tree, highlighted_nodes)
+            tree_image = await run_render(generate_tree_image, tree, highlighted_nodes)
         
         return ETESearchResponse(
             success=True,
@@ -676,17 +1145,26 @@ async def ete_tree_search(request: ETESearchRequest):
             message=f"Search failed: {str(e)}"
         )
 
+@router.get("/tree-image/{image_key}")
+@monitor_performance(threshold_ms=50.0)
+@track_memory_usage
+async def get_tree_image(image_key: str):
+    """Serve a tree image rendered for an ETE search"""
+    image_path = _tree_image_path(image_key)
+    if not re.fullmatch(r"[0-9a-f]{32}", image_key) or not os.path.exists(image_path):
+        raise HTTPException(status_code=404, detail=f"Tree image {image_key} not found")
+    return FileResponse(image_path, media_type="image/png")
+
 @router.get("/tree", response_model=Dict[str, Any])
 @monitor_performance(threshold_ms=50.0)
 @track_memory_usage
 async def get_orthologue_tree():
     """Obtenir l'arbre phylogénétique des espèces au format Newick"""
     try:
-        species_tree = load_species_tree()
-        return {
-            "success": True,
-            "newick": species_tree
-        }
+        species_tree = await asyncio.to_thread(load_species_tree)
+        # The tree never changes once loaded; send the cached bytes instead of
+        # re-encoding a possibly multi-MB string on every request
+        return Response(content=_tree_response_body(species_tree), media_type="application/json")
     except Exception as e:
         return {
             "success": False,
@@ -706,9 +1184,9 @@ async def get_ete_status():
                 "message": "ETE3 toolkit not installed. Install with: conda install -c etetoolkit ete3"
             }
         
-        # Test ETE functionality
-        tree = load_ete_tree()
-        leaf_count = len(tree.get_leaves())
+        # Test ETE functionality; the leaf count comes from the load-time index
+        await asyncio.to_thread(load_ete_tree)
+        leaf_count = len(_clade_leaf_names)
         
         return {
             "success": True,
@@ -732,12 +1210,11 @@ async def get_ete_status():
 async def debug_species_mapping_endpoint():
     """Debug endpoint to check species mapping issues"""
     try:
-        # Load orthogroups data
-        ortho_df = pd.read_csv(ORTHOGROUPS_FILE, sep='\t', low_memory=False)
-        species_columns = ortho_df.columns[1:].tolist()
+        # Species columns from the orthogroups header
+        species_columns = _orthogroups_columns()[1:]
         
         # Load mapping data
-        mapping_df = pd.read_csv(SPECIES_MAPPING_FILE, sep='\t', skiprows=2)
+        mapping_df = _species_mapping_table()
         species_full_col = mapping_df.columns[0]
         species_id_col = mapping_df.columns[1]
         
@@ -747,11 +1224,11 @@ async def debug_species_mapping_endpoint():
         missing_in_mapping = ortho_codes - mapping_codes
         found_in_both = ortho_codes & mapping_codes
         
-        # Sample mappings for found codes
-        sample_mappings = {}
-        for code in list(found_in_both)[:10]:
-            full_name = mapping_df[mapping_df[species_id_col] == code][species_full_col].iloc[0]
-            sample_mappings[code] = full_name
+        # Sample mappings for found codes; first row wins, as with a filter + iloc[0]
+        id_to_full = {}
+        for species_id, full_name in zip(mapping_df[species_id_col].to_numpy(), mapping_df[species_full_col].to_numpy()):
+            id_to_full.setdefault(species_id, full_name)
+        sample_mappings = {code: id_to_full[code] for code in list(found_in_both)[:10]}
         
         return {
             "success": True,
@@ -765,7 +1242,8 @@ async def debug_species_mapping_endpoint():
                 "count": len(found_in_both),
                 "examples": sample_mappings
             },
-            "mapping_file_columns": mapping_df.columns.tolist(),
+            # The cached table holds only the name/ID columns; report the full header
+            "mapping_file_columns": pd.read_csv(SPECIES_MAPPING_FILE, sep='\t', skiprows=2, nrows=0).columns.tolist(),
             "ortho_file_columns_sample": species_columns[:10],
             "ete_available": ETE_AVAILABLE
         }
@@ -796,7 +1274,7 @@ async def get_orthogroups(
             return cached_data
         
         # If not in cache, load from repository
-        data, pagination = repo.load_orthogroups_data(page=page, per_page=per_page)
+        data, pagination = await asyncio.to_thread(repo.load_orthogroups_data, page=page, per_page=per_page)
         
         response = {
             "success": True,
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from typing import List
+from functools import lru_cache
 import uuid
 import os
 
@@ -19,10 +20,25 @@ router.include_router(biological_router)
 router.include_router(phylo_router)
 router.include_router(orthologue_router)
 
+# Service providers - the services are stateless, so one shared instance
+# is enough instead of a new one for every request
+
+@lru_cache(maxsize=1)
+def get_data_ingestion_service() -> DataIngestionService:
+    return DataIngestionService()
+
+@lru_cache(maxsize=1)
+def get_semantic_reasoning_service() -> SemanticReasoningService:
+    return SemanticReasoningService()
+
+@lru_cache(maxsize=1)
+def get_visualization_service() -> VisualizationService:
+    return VisualizationService()
+
 @router.post("/upload", response_model=ProcessedDataResponse)
 async def upload_data(
     file: UploadFile = File(...),
-    data_service: DataIngestionService = Depends()
+    data_service: DataIngestionService = Depends(get_data_ingestion_service)
 ):
     """Upload and process biological data file"""
     try:
@@ -62,7 +78,7 @@ async def upload_data(
 @router.post("/analyze", response_model=dict)
 async def analyze_data(
     request: AnalysisRequest,
-    reasoning_service: SemanticReasoningService = Depends()
+    reasoning_service: SemanticReasoningService = Depends(get_semantic_reasoning_service)
 ):
     """Analyze biological data using semantic reasoning"""
     try:
@@ -74,7 +90,7 @@ async def analyze_data(
 @router.post("/visualize", response_model=dict)
 async def visualize_data(
     request: VisualizationRequest,
-    viz_service: VisualizationService = Depends()
+    viz_service: VisualizationService = Depends(get_visualization_service)
 ):
     """Generate visualization for biological data"""
     try:
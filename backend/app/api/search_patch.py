@@ -4,7 +4,7 @@ that properly resolves species names and counts.
 """
 import logging
 from ..models.phylo import OrthologueSearchResponse, OrthologueData, OrthoSpeciesCount
-from ..utils.species_utils import get_species_full_name
+from ..utils.species_utils import get_species_full_names
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +21,6 @@ async def search_orthologues_patched(
         df = load_orthogroups_data()
         logger.info(f"Loaded orthogroups data with shape: {df.shape}")
         
-        # Préparer la réponse
-        orthologues = []
-        counts_by_species = []
-        
         # First, create counts for all species (even those with zero orthologues)
         # We'll use the species from the orthogroup data as the source of truth
         species_columns = [col for col in df.columns if col != df.columns[0]]  # Skip the first column (orthogroup ID)
@@ -33,42 +29,36 @@ async def search_orthologues_patched(
         # Create a set of all species from the orthogroup data
         all_species_ids = set(species_columns)
         
-        # Add species counts for all species
-        for species_id in all_species_ids:
-            # Get the full name using our utility function
-            species_full_name = get_species_full_name(species_id, species_mapping)
-            
-            # Count genes for this species (0 if species not in the orthogroup)
-            gene_count = len(genes_by_species.get(species_id, []))
-            
-            # Add to counts (include all species, even those with 0 count)
-            counts_by_species.append(
-                OrthoSpeciesCount(
-                    species_id=species_id,
-                    species_name=species_full_name,
-                    count=gene_count
-                )
+        # Resolve every species name once; both loops below reuse them
+        species_names = get_species_full_names(list(all_species_ids) + list(genes_by_species), species_mapping)
+        
+        # Add species counts for all species (0 if species not in the orthogroup).
+        # Every field comes from the loaded table and mapping, so rows are built
+        # with model_construct instead of being validated one by one
+        counts_by_species = [
+            OrthoSpeciesCount.model_construct(
+                species_id=species_id,
+                species_name=species_names[species_id],
+                count=len(genes_by_species.get(species_id, ()))
             )
+            for species_id in all_species_ids
+        ]
         
         logger.info(f"Total species in counts: {len(counts_by_species)}")
         
-        # Now add the actual orthologues
-        for species_id, genes in genes_by_species.items():
-            # Get the full name using our utility function
-            species_full_name = get_species_full_name(species_id, species_mapping)
-            
-            # Add the orthologues for this species
-            for gene in genes:
-                # Ne pas ajouter le gène de requête lui-même
-                if gene != gene_id:
-                    orthologues.append(
-                        OrthologueData(
-                            gene_id=gene,
-                            species_id=species_id,
-                            species_name=species_full_name,
-                            orthogroup_id=orthogroup_id
-                        )
-                    )
+        # Now add the actual orthologues, without the query gene itself
+        orthologues = [
+            OrthologueData.model_construct(
+                gene_id=gene,
+                species_id=species_id,
+                species_name=species_names[species_id],
+                orthogroup_id=orthogroup_id,
+                sequence=None
+            )
+            for species_id, genes in genes_by_species.items()
+            for gene in genes
+            if gene != gene_id
+        ]
         
         logger.info(f"Returning {len(orthologues)} orthologues for gene {gene_id}")
         
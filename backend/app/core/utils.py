@@ -1,5 +1,7 @@
+import asyncio
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 from fastapi import HTTPException, status
 
@@ -7,6 +9,10 @@ from .config import get_settings
 
 settings = get_settings()
 
+# Qt objects belong to the thread that first created them, so every ETE3 render
+# goes through this single worker instead of whichever pool thread is free
+_render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ete3-render")
+
 
 def load_json_data(filepath: str) -> Dict[str, Any]:
     """Load data from a JSON file.
@@ -77,4 +83,16 @@ def ensure_directory_exists(directory: str) -> None:
     Args:
         directory: Path to the directory
     """
-    os.makedirs(directory, exist_ok=True)
\ No newline at end of file
+    os.makedirs(directory, exist_ok=True)
+
+async def run_render(func, *args):
+    """Run a blocking ETE3 rendering call on the shared render thread.
+    
+    Args:
+        func: Callable that renders a tree
+        *args: Positional arguments for ``func``
+        
+    Returns:
+        Whatever ``func`` returns
+    """
+    return await asyncio.get_running_loop().run_in_executor(_render_executor, func, *args)
@@ -6,6 +6,13 @@ from fastapi import HTTPException
 from functools import lru_cache
 from app.core.config import get_settings
 
+# PyArrow gives a multi-threaded CSV parser for the full-table gene index
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 # Configure logging
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -23,7 +30,9 @@ class OrthogroupsRepository:
         
         # Enhanced caching
         self._orthogroups_chunks = {}
-        self._gene_map = {}
+        self._table = None  # Whole file, read on the first gene or orthogroup lookup
+        self._gene_map = None
+        self._orthogroup_rows = None
         self._total_chunks = None
         self._header = None
         self._file_size = None
@@ -119,10 +128,6 @@ class OrthogroupsRepository:
             start_offset = start_index % self.CHUNK_SIZE
             result_df = combined_df.iloc[start_offset:start_offset + per_page].copy()
             
-            # Build gene mapping only if needed
-            if not self._gene_map:
-                self._gene_map = self._build_gene_to_orthogroup_map(result_df)
-            
             total_records = self.get_total_chunks() * self.CHUNK_SIZE
             total_pages = (total_records + per_page - 1) // per_page
             
@@ -142,30 +147,65 @@ class OrthogroupsRepository:
     def _build_gene_to_orthogroup_map(self, df: pd.DataFrame) -> Dict[str, str]:
         """Build gene to orthogroup mapping for faster lookups"""
         gene_map = {}
-        # Optimize mapping creation
-        for idx, row in df.iterrows():
-            orthogroup_id = row.get('Orthogroup')
+        if 'Orthogroup' not in df.columns:
+            return gene_map
+        og_pos = df.columns.get_loc('Orthogroup')
+        # Plain row tuples avoid building a Series per row; each cell lists
+        # several genes, so it is split once and every gene indexed on its own
+        for row in df.itertuples(index=False, name=None):
+            orthogroup_id = row[og_pos]
             if orthogroup_id:
-                # Use numpy operations for better performance
-                genes = row.iloc[1:].values
-                for gene in genes[pd.notna(genes)]:
-                        gene_map[gene] = orthogroup_id
+                for cell_value in row[1:]:
+                    if isinstance(cell_value, str):
+                        for gene in cell_value.split(','):
+                            gene = gene.strip()
+                            if gene:
+                                gene_map[gene] = orthogroup_id
         return gene_map
 
+    def get_full_table(self) -> pd.DataFrame:
+        """The whole orthogroups file, read on first use"""
+        if self._table is None:
+            try:
+                sep = '\t' if self.ORTHOGROUPS_FILE.endswith(('.tsv', '.txt')) else ','
+                # The pyarrow engine reads empty cells as NaN; lookups only
+                # use string cells, so results are the same either way
+                parser = {'engine': 'pyarrow'} if HAS_PYARROW else {'engine': 'c', 'na_filter': False}
+                self._table = pd.read_csv(self.ORTHOGROUPS_FILE, sep=sep, dtype=str, **parser)
+            except Exception as e:
+                logger.error(f"Failed to read orthogroups file: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Failed to read orthogroups file: {str(e)}")
+        return self._table
+
+    def _get_gene_map(self) -> Dict[str, str]:
+        """Gene to orthogroup map over the whole file, built on first use"""
+        if self._gene_map is None:
+            self._gene_map = self._build_gene_to_orthogroup_map(self.get_full_table())
+        return self._gene_map
+
+    def _get_orthogroup_rows(self) -> Dict[str, int]:
+        """Row position of each orthogroup ID in the whole file; the first row wins"""
+        if self._orthogroup_rows is None:
+            rows = {}
+            for position, orthogroup_id in enumerate(self.get_full_table().iloc[:, 0]):
+                rows.setdefault(orthogroup_id, position)
+            self._orthogroup_rows = rows
+        return self._orthogroup_rows
+
     def get_orthogroup_genes(self, orthogroup_id: str) -> Dict[str, List[str]]:
         """Get all genes in an orthogroup, organized by species"""
-        df = self.load_orthogroups_data()
+        df = self.get_full_table()
         
         # Find row with this orthogroup ID
-        orthogroup_row = df[df[df.columns[0]] == orthogroup_id]
+        position = self._get_orthogroup_rows().get(orthogroup_id)
         
-        if orthogroup_row.empty:
+        if position is None:
             return {}
         
-        # Extract genes by species
+        # Extract genes by species from one plain row instead of indexing per cell
         genes_by_species = {}
-        for col in df.columns[1:]:  # Skip orthogroup ID column
-            cell_value = orthogroup_row[col].iloc[0]
+        row = df.iloc[position].to_numpy()
+        for col, cell_value in zip(df.columns[1:], row[1:]):  # Skip orthogroup ID column
             if isinstance(cell_value, str) and cell_value.strip():
                 genes = [gene.strip() for gene in cell_value.split(',')]
                 genes_by_species[col] = genes
@@ -174,8 +214,7 @@ class OrthogroupsRepository:
 
     def find_gene_orthogroup(self, gene_id: str) -> Optional[str]:
         """Find orthogroup ID for a given gene"""
-        self.load_orthogroups_data()  # Ensure data is loaded
-        return self._gene_map.get(gene_id)
+        return self._get_gene_map().get(gene_id)
 
     def get_species_columns(self) -> List[str]:
         """Get list of all species columns from orthogroups data"""
@@ -195,14 +234,15 @@ class OrthogroupsRepository:
     def get_gene_count_by_species(self) -> Dict[str, int]:
         """Get the count of genes for each species."""
         df = self.load_orthogroups_data()
-        gene_counts = {}
-        
-        for col in df.columns[1:]:  # Skip orthogroup ID column
-            gene_counts[col] = 0
-            for _, row in df.iterrows():
-                cell_value = row[col]
-                if isinstance(cell_value, str) and cell_value.strip():
-                    genes = [gene.strip() for gene in cell_value.split(',') if gene.strip()]
-                    gene_counts[col] += len(genes)
-        
-        return gene_counts
\ No newline at end of file
+        species_cols = list(df.columns[1:])  # Skip orthogroup ID column
+        counts = [0] * len(species_cols)
+        split_ = str.split
+        strip_ = str.strip
+
+        # Single pass over plain row tuples, with the str methods bound to locals
+        for _, *cells in df.itertuples(index=False, name=None):
+            for i, cell_value in enumerate(cells):
+                if isinstance(cell_value, str) and strip_(cell_value):
+                    counts[i] += sum(1 for gene in split_(cell_value, ',') if strip_(gene))
+
+        return dict(zip(species_cols, counts))
\ No newline at end of file
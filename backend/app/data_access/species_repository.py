@@ -8,6 +8,15 @@ from .mock_repository import MockRepository
 
 logger = logging.getLogger(__name__)
 
+# Genus guessed for unmapped species codes, keyed by the code's first letter
+_FALLBACK_GENUS = {
+    'A': 'Arabidopsis', 'B': 'Brassica', 'C': 'Citrus', 'D': 'Daucus',
+    'E': 'Eucalyptus', 'F': 'Fragaria', 'G': 'Glycine', 'H': 'Helianthus',
+    'L': 'Lotus', 'M': 'Medicago', 'N': 'Nicotiana', 'O': 'Oryza',
+    'P': 'Populus', 'Q': 'Quercus', 'R': 'Ricinus', 'S': 'Solanum',
+    'T': 'Triticum', 'V': 'Vigna', 'W': 'Wheat line', 'Z': 'Zea',
+}
+
 class SpeciesRepository(MockRepository[Species]):
     """Repository for accessing species data."""
     
@@ -48,11 +57,12 @@ class SpeciesRepository(MockRepository[Species]):
                 id_to_full = dict(zip(mapping_df[species_id_col], mapping_df[species_full_col]))
                 full_to_id = dict(zip(mapping_df[species_full_col], mapping_df[species_id_col]))
                 
+                # Read-only views of the same data share one dict
                 self._species_mapping = {
                     'id_to_full': id_to_full,
                     'full_to_id': full_to_id,
-                    'newick_to_full': id_to_full.copy(),
-                    'prefix_to_full': id_to_full.copy()
+                    'newick_to_full': id_to_full,
+                    'prefix_to_full': id_to_full
                 }
                 
             except Exception as e:
@@ -79,45 +89,19 @@ class SpeciesRepository(MockRepository[Species]):
         """Get full species name from code with fallback to generated name"""
         mapping = self.load_species_mapping()
         
-        # Try different mapping strategies
-        for mapping_key in ['id_to_full', 'prefix_to_full', 'newick_to_full']:
-            if species_code in mapping.get(mapping_key, {}):
-                return mapping[mapping_key][species_code]
+        # id_to_full, prefix_to_full and newick_to_full are one shared dict
+        full_name = mapping['id_to_full'].get(species_code)
+        if full_name is not None:
+            return full_name
         
         # Generate fallback name if not found
         return self.generate_fallback_name(species_code)
 
     def generate_fallback_name(self, species_code: str) -> str:
         """Generate a reasonable fallback name for unmapped species codes"""
-        genus_hints = {
-            'A': ['Arabidopsis', 'Aegilops', 'Actinidia', 'Amaranthus', 'Acorus'],
-            'B': ['Brassica', 'Beta', 'Bambusa'],
-            'C': ['Citrus', 'Cannabis', 'Cucumis', 'Coffea', 'Camelina', 'Capsella'],
-            'D': ['Daucus'],
-            'E': ['Eucalyptus'],
-            'F': ['Fragaria'],
-            'G': ['Glycine', 'Gossypium'],
-            'H': ['Helianthus', 'Hordeum'],
-            'L': ['Lotus', 'Lupinus', 'Lactuca', 'Linum'],
-            'M': ['Medicago', 'Malus', 'Musa', 'Manihot'],
-            'N': ['Nicotiana', 'Nelumbo'],
-            'O': ['Oryza', 'Olea'],
-            'P': ['Populus', 'Pisum', 'Prunus', 'Panicum', 'Phaseolus'],
-            'Q': ['Quercus'],
-            'R': ['Ricinus'],
-            'S': ['Solanum', 'Sorghum', 'Setaria', 'Sesamum'],
-            'T': ['Triticum', 'Theobroma', 'Trifolium'],
-            'V': ['Vigna', 'Vitis'],
-            'W': ['Wheat line'],
-            'Z': ['Zea']
-        }
-        
-        if len(species_code) >= 1:
-            first_letter = species_code[0].upper()
-            if first_letter in genus_hints:
-                possible_genera = genus_hints[first_letter]
-                return f"{possible_genera[0]} sp. ({species_code})"
-        
+        genus = _FALLBACK_GENUS.get(species_code[:1].upper())
+        if genus:
+            return f"{genus} sp. ({species_code})"
         return f"Species {species_code}"
 
     def enhance_species_mapping(self, ortho_species: Set[str]) -> Dict:
@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 
+import asyncio
 import os
 import json
 import uuid
@@ -16,7 +17,7 @@ try:
         DashboardResponse, DashboardData, NameValuePair, GeneByOrthogroup
     )
     from .api.phylo import router as phylo_router
-    from .api.orthologue import router as orthologue_router
+    from .api.orthologue import router as orthologue_router, preload_data
 except ImportError:
     # For direct module execution
     from app.models.biological_models import (
@@ -25,7 +26,7 @@ except ImportError:
         DashboardResponse, DashboardData, NameValuePair, GeneByOrthogroup
     )
     from app.api.phylo import router as phylo_router
-    from app.api.orthologue import router as orthologue_router
+    from app.api.orthologue import router as orthologue_router, preload_data
 
 # Create FastAPI app
 app = FastAPI(
@@ -554,6 +555,16 @@ async def analyze(data: Dict[str, Any]):
 app.include_router(phylo_router)
 app.include_router(orthologue_router)
 
+# Startup tasks are referenced here so they are not garbage collected mid-run
+_startup_tasks = set()
+
+@app.on_event("startup")
+async def preload_orthologue_data():
+    """Load orthologue data in the background instead of on the first request"""
+    task = asyncio.create_task(preload_data())
+    _startup_tasks.add(task)
+    task.add_done_callback(_startup_tasks.discard)
+
 # Run the app with uvicorn if this file is executed directly
 if __name__ == "__main__":
     import uvicorn
@@ -92,7 +92,7 @@ class ETESearchResponse(BaseModel):
     search_type: str
     results: List[ETESearchResult]
     total_results: int
-    tree_image: Optional[str] = None  # Base64 encoded image
+    tree_image: Optional[str] = None  # Image URL or base64 data URI
     message: Optional[str] = None
 
 # =============================================================================
@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import os
+import threading
 import tempfile
 import base64
 from typing import List, Dict, Any, Optional
@@ -9,6 +11,7 @@ from ete3 import Tree, TreeStyle, NodeStyle
 from app.core.config import get_settings
 from app.data_access.orthogroups_repository import OrthogroupsRepository
 from app.data_access.species_repository import SpeciesRepository
+from app.core.utils import run_render
 from app.models.phylo import (
     ETESearchRequest, ETESearchResponse, ETESearchResult
 )
@@ -24,6 +27,9 @@ try:
 except ImportError as e:
     ETE_AVAILABLE = False
 
+# Rendered tree images kept per service instance
+TREE_IMAGE_CACHE_SIZE = 64
+
 class ETETreeService:
     """Service for ETE toolkit operations"""
 
@@ -31,6 +37,19 @@ class ETETreeService:
         """Initialize the ETE tree service"""
         self.tree_file = settings.TREE_FILE
         self._tree = None
+        self._leaf_by_code = {}
+        self._clade_spans = {}  # Node -> (start, stop) of its leaves in the per-leaf lists below
+        self._clade_names = []  # Full species name per leaf, in preorder leaf order
+        self._leaves_lower = []  # (lowercased full species name, leaf), same order
+        self._species_search_index = []  # (leaf, full_name, leaf_name_lower, full_name_lower), same order
+        self._clade_search_strings = {}  # Node -> its leaves' lowercased names joined by spaces
+        self._clade_gene_prefix = [0]  # Running gene_count total over the same leaf order
+        self._status = None
+        self._tree_images = {}  # Sorted highlighted node names -> rendered data URI, oldest first
+        self._gene_species = None  # Gene ID -> species columns listing it, built on first gene search
+        self._tree_lock = threading.Lock()
+        self._gene_species_lock = threading.Lock()
+        self._render_lock = threading.Lock()  # Node styles live on the shared tree
         self.orthogroups_repo = OrthogroupsRepository()
         self.species_repo = SpeciesRepository()
     
@@ -40,14 +59,61 @@ class ETETreeService:
     
     def load_ete_tree(self) -> Tree:
         """Load the ETE tree from file"""
+        # Fast path without the lock once loaded; the lock makes concurrent first
+        # calls (from worker threads) share one load
         if self._tree is None:
-            try:
-                logger.info(f"Loading ETE tree from {self.tree_file}")
-                self._tree = Tree(self.tree_file, format=1)
-                logger.info("ETE tree loaded successfully")
-            except Exception as e:
-                logger.error(f"Failed to load ETE tree: {str(e)}")
-                raise
+            with self._tree_lock:
+                if self._tree is None:
+                    try:
+                        logger.info(f"Loading ETE tree from {self.tree_file}")
+                        tree = Tree(self.tree_file, format=1)
+                        # One preorder pass: root distances are accumulated once instead of
+                        # walking parent pointers per search result, and each species code
+                        # maps to the first leaf carrying it, for O(1) lookups by code
+                        leaf_by_code = {}
+                        leaf_codes = []
+                        clade_names = []
+                        clade_gene_prefix = [0]
+                        for node in tree.traverse("preorder"):
+                            node.add_feature("dist_to_root", 0.0 if node.up is None else node.up.dist_to_root + node.dist)
+                            if node.is_leaf():
+                                code = node.name.strip().strip('"\'')
+                                leaf_codes.append(code)
+                                leaf_by_code.setdefault(code, node)
+                                clade_names.append(getattr(node, "full_species_name", node.name))
+                                clade_gene_prefix.append(clade_gene_prefix[-1] + getattr(node, "gene_count", 0))
+                
+                        # Leaves of any clade are contiguous in that order, so each node is
+                        # reduced to a span instead of re-walking get_leaves() per search;
+                        # the joined string clade search matches against is built bottom-up too
+                        clade_spans = {}
+                        clade_search_strings = {}
+                        position = 0
+                        for node in tree.traverse("postorder"):
+                            if node.is_leaf():
+                                clade_spans[node] = (position, position + 1)
+                                clade_search_strings[node] = clade_names[position].lower()
+                                position += 1
+                            else:
+                                clade_spans[node] = (clade_spans[node.children[0]][0], clade_spans[node.children[-1]][1])
+                                clade_search_strings[node] = " ".join(clade_search_strings[child] for child in node.children)
+                
+                        self._leaf_by_code = leaf_by_code
+                        self._clade_spans = clade_spans
+                        self._clade_names = clade_names
+                        self._leaves_lower = [(name.lower(), leaf) for name, leaf in zip(clade_names, tree.iter_leaves())]
+                        species_search_index = []
+                        for leaf, leaf_name in zip(tree.iter_leaves(), leaf_codes):
+                            full_name = getattr(leaf, "full_species_name", leaf_name)
+                            species_search_index.append((leaf, full_name, leaf_name.lower(), full_name.lower()))
+                        self._species_search_index = species_search_index
+                        self._clade_search_strings = clade_search_strings
+                        self._clade_gene_prefix = clade_gene_prefix
+                        self._tree = tree
+                        logger.info("ETE tree loaded successfully")
+                    except Exception as e:
+                        logger.error(f"Failed to load ETE tree: {str(e)}")
+                        raise
         return self._tree
     
     def search_tree_by_gene(self, gene_id: str, max_results: int = 50) -> List[ETESearchResult]:
@@ -56,57 +122,70 @@ class ETETreeService:
             return []
         
         results = []
-        tree = self.load_ete_tree()
-        ortho_data = self.orthogroups_repo.load_orthogroups_data()
-        
-        # Find which species have this gene
-        species_with_gene = []
-        for col in ortho_data.columns[1:]:
-            for _, row in ortho_data.iterrows():
-                cell_value = row[col]
-                if isinstance(cell_value, str) and gene_id in cell_value:
-                    species_with_gene.append(col)
-                    break
+        self.load_ete_tree()
         
+        # Find which species list this exact gene ID
+        species_with_gene = self._gene_species_index().get(gene_id, [])[:max_results]
+
         # Find corresponding tree nodes
-        for species_code in species_with_gene[:max_results]:
-            for leaf in tree.get_leaves():
-                if leaf.name.strip().strip('"\'') == species_code:
-                    result = ETESearchResult(
-                        node_name=getattr(leaf, "full_species_name", leaf.name),
-                        node_type="leaf",
-                        distance_to_root=leaf.get_distance(tree),
-                        gene_count=getattr(leaf, "gene_count", 0),
-                        species_count=1,
-                        clade_members=[getattr(leaf, "full_species_name", leaf.name)]
-                    )
-                    results.append(result)
-                    break
+        for species_code in species_with_gene:
+            leaf = self._leaf_by_code.get(species_code)
+            if leaf is not None:
+                result = ETESearchResult(
+                    node_name=getattr(leaf, "full_species_name", leaf.name),
+                    node_type="leaf",
+                    distance_to_root=leaf.dist_to_root,
+                    gene_count=getattr(leaf, "gene_count", 0),
+                    species_count=1,
+                    clade_members=[getattr(leaf, "full_species_name", leaf.name)]
+                )
+                results.append(result)
         
         return results
     
+    def _gene_species_index(self) -> Dict[str, List[str]]:
+        """Species columns listing each gene of the orthogroups data, indexed once
+        
+        Columns are walked in order, so each gene's species keep column order.
+        """
+        if self._gene_species is None:
+            with self._gene_species_lock:
+                if self._gene_species is None:
+                    ortho_data = self.orthogroups_repo.get_full_table()
+                    gene_species = {}
+                    for species in ortho_data.columns[1:]:
+                        for cell_value in ortho_data[species].to_numpy():
+                            if not isinstance(cell_value, str):
+                                continue
+                            for gene in cell_value.split(','):
+                                gene = gene.strip()
+                                if not gene:
+                                    continue
+                                listed = gene_species.setdefault(gene, [])
+                                if not listed or listed[-1] != species:
+                                    listed.append(species)
+                    self._gene_species = gene_species
+        return self._gene_species
+    
     def search_tree_by_species(self, species_query: str, max_results: int = 50) -> List[ETESearchResult]:
         """Search for species by name (fuzzy matching)."""
         if not ETE_AVAILABLE:
             return []
         
         results = []
-        tree = self.load_ete_tree()
+        self.load_ete_tree()
         query_lower = species_query.lower()
         
-        for leaf in tree.get_leaves():
-            leaf_name = leaf.name.strip().strip('"\'')
-            full_name = getattr(leaf, "full_species_name", leaf_name)
-            
+        # Names were lowercased once in load_ete_tree; a match inside any word of the
+        # full name is also a match inside the full name itself
+        for leaf, full_name, leaf_name_lower, full_name_lower in self._species_search_index:
             # Check if query matches species name
-            if (query_lower in leaf_name.lower() or
-                query_lower in full_name.lower() or
-                any(query_lower in word.lower() for word in full_name.split())):
+            if query_lower in leaf_name_lower or query_lower in full_name_lower:
                 
                 result = ETESearchResult(
                     node_name=full_name,
                     node_type="leaf",
-                    distance_to_root=leaf.get_distance(tree),
+                    distance_to_root=leaf.dist_to_root,
                     gene_count=getattr(leaf, "gene_count", 0),
                     species_count=1,
                     clade_members=[full_name]
@@ -130,22 +209,16 @@ class ETETreeService:
         # Search internal nodes for clades
         for node in tree.traverse():
             if not node.is_leaf():
-                # Get all species in this clade
-                clade_species = []
-                total_genes = 0
-                
-                for leaf in node.get_leaves():
-                    full_name = getattr(leaf, "full_species_name", leaf.name)
-                    clade_species.append(full_name)
-                    total_genes += getattr(leaf, "gene_count", 0)
-                
                 # Check if this clade matches the query
-                clade_string = " ".join(clade_species).lower()
-                if query_lower in clade_string:
+                if query_lower in self._clade_search_strings[node]:
+                    # Species in this clade, read off the precomputed leaf span
+                    start, stop = self._clade_spans[node]
+                    clade_species = self._clade_names[start:stop]
+                    total_genes = self._clade_gene_prefix[stop] - self._clade_gene_prefix[start]
                     result = ETESearchResult(
                         node_name=f"Clade with {len(clade_species)} species",
                         node_type="internal",
-                        distance_to_root=node.get_distance(tree),
+                        distance_to_root=node.dist_to_root,
                         support_value=getattr(node, "support", None),
                         species_count=len(clade_species),
                         gene_count=total_genes,
@@ -166,32 +239,28 @@ class ETETreeService:
         results = []
         tree = self.load_ete_tree()
         
-        # Find tree nodes for each species
+        # Find tree nodes for each species: the first leaf whose lowercased
+        # name (prepared at load) contains the query
         target_nodes = []
         for species in species_list:
-            for leaf in tree.get_leaves():
-                full_name = getattr(leaf, "full_species_name", leaf.name)
-                if species.lower() in full_name.lower():
-                    target_nodes.append(leaf)
-                    break
+            query_lower = species.lower()
+            leaf = next((leaf for name_lower, leaf in self._leaves_lower if query_lower in name_lower), None)
+            if leaf is not None:
+                target_nodes.append(leaf)
         
         if len(target_nodes) >= 2:
             # Find common ancestor
             ancestor = tree.get_common_ancestor(target_nodes)
             
             # Get all species under this ancestor
-            descendant_species = []
-            total_genes = 0
-            
-            for leaf in ancestor.get_leaves():
-                full_name = getattr(leaf, "full_species_name", leaf.name)
-                descendant_species.append(full_name)
-                total_genes += getattr(leaf, "gene_count", 0)
+            start, stop = self._clade_spans[ancestor]
+            descendant_species = self._clade_names[start:stop]
+            total_genes = self._clade_gene_prefix[stop] - self._clade_gene_prefix[start]
             
             result = ETESearchResult(
                 node_name=f"Common ancestor of {', '.join(species_list)}",
                 node_type="internal",
-                distance_to_root=ancestor.get_distance(tree),
+                distance_to_root=ancestor.dist_to_root,
                 support_value=getattr(ancestor, "support", None),
                 species_count=len(descendant_species),
                 gene_count=total_genes,
@@ -202,10 +271,19 @@ class ETETreeService:
         return results
     
     def generate_tree_image(self, highlighted_nodes: Optional[List[str]] = None) -> Optional[str]:
-        """Generate tree visualization with ETE and return as base64 string."""
+        """Generate tree visualization with ETE and return as base64 string.
+        
+        The tree never changes once loaded, so images are cached per highlight set.
+        """
         if not ETE_AVAILABLE:
             return None
         
+        # Highlighting tests membership only, so order and repeats don't matter
+        image_key = tuple(sorted(set(highlighted_nodes or ())))
+        cached = self._tree_images.get(image_key)
+        if cached is not None:
+            return cached
+        
         try:
             tree = self.load_ete_tree()
             
@@ -216,35 +294,40 @@ class ETETreeService:
             ts.arc_start = 0
             ts.arc_span = 360
             
-            # Style nodes
-            for node in tree.traverse():
-                nstyle = NodeStyle()
+            # Node styles live on the shared tree, so styling and rendering go together
+            with self._render_lock:
+                # Style nodes
+                for node in tree.traverse():
+                    nstyle = NodeStyle()
                 
-                if highlighted_nodes and node.name in highlighted_nodes:
-                    nstyle["bgcolor"] = "#ffcccc"
-                    nstyle["size"] = 15
-                elif node.is_leaf():
-                    if hasattr(node, "gene_count") and node.gene_count > 0:
-                        nstyle["fgcolor"] = "#4caf50"
-                        nstyle["size"] = max(5, min(15, node.gene_count // 100))
+                    if highlighted_nodes and node.name in highlighted_nodes:
+                        nstyle["bgcolor"] = "#ffcccc"
+                        nstyle["size"] = 15
+                    elif node.is_leaf():
+                        if hasattr(node, "gene_count") and node.gene_count > 0:
+                            nstyle["fgcolor"] = "#4caf50"
+                            nstyle["size"] = max(5, min(15, node.gene_count // 100))
+                        else:
+                            nstyle["fgcolor"] = "#9e9e9e"
+                            nstyle["size"] = 5
                     else:
-                        nstyle["fgcolor"] = "#9e9e9e"
-                        nstyle["size"] = 5
-                else:
-                    nstyle["size"] = 3
+                        nstyle["size"] = 3
                     
-                node.set_style(nstyle)
+                    node.set_style(nstyle)
             
-            # Render to image
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=True) as tmp:
-                tree.render(tmp.name, tree_style=ts, w=800, h=600, dpi=150)
+                # Render to image
+                with tempfile.NamedTemporaryFile(suffix=".png", delete=True) as tmp:
+                    tree.render(tmp.name, tree_style=ts, w=800, h=600, dpi=150)
                 
-                # Read image and convert to base64
-                with open(tmp.name, "rb") as img_file:
-                    img_data = img_file.read()
-                    base64_string = base64.b64encode(img_data).decode('utf-8')
-                
-                return f"data:image/png;base64,{base64_string}"
+                    # ete3 wrote through the path; read it back on the handle already open
+                    tmp.seek(0)
+                    img_data = tmp.read()
+            
+            image_uri = f"data:image/png;base64,{base64.b64encode(img_data).decode('ascii')}"
+            if len(self._tree_images) >= TREE_IMAGE_CACHE_SIZE:
+                self._tree_images.pop(next(iter(self._tree_images)))
+            self._tree_images[image_key] = image_uri
+            return image_uri
         
         except Exception as e:
             logger.error(f"Failed to generate tree image: {str(e)}")
@@ -263,19 +346,20 @@ class ETETreeService:
             )
         
         try:
-            logger.info(f"ETE search: {request.search_type} for '{request.query}'")
+            logger.info("ETE search: %s for '%s'", request.search_type, request.query)
             results = []
             
+            # Tree searches are CPU-bound, so each runs in a worker thread
             if request.search_type == "gene":
-                results = self.search_tree_by_gene(request.query, request.max_results)
+                results = await asyncio.to_thread(self.search_tree_by_gene, request.query, request.max_results)
             elif request.search_type == "species":
-                results = self.search_tree_by_species(request.query, request.max_results)
+                results = await asyncio.to_thread(self.search_tree_by_species, request.query, request.max_results)
             elif request.search_type == "clade":
-                results = self.search_tree_by_clade(request.query, request.max_results)
+                results = await asyncio.to_thread(self.search_tree_by_clade, request.query, request.max_results)
             elif request.search_type == "common_ancestor":
                 # Parse comma-separated species list
                 species_list = [s.strip() for s in request.query.split(",")]
-                results = self.find_common_ancestor(species_list)
+                results = await asyncio.to_thread(self.find_common_ancestor, species_list)
             else:
                 return ETESearchResponse(
                     success=False,
@@ -290,7 +374,7 @@ class ETETreeService:
             tree_image = None
             if request.include_tree_image and results:
                 highlighted_nodes = [r.node_name for r in results[:5]]  # Highlight first 5 results
-                tree_image = self.generate_tree_image(highlighted_nodes)
+                tree_image = await run_render(self.generate_tree_image, highlighted_nodes)
             
             return ETESearchResponse(
                 success=True,
@@ -316,14 +400,18 @@ class ETETreeService:
     def get_ete_status(self) -> Dict[str, Any]:
         """Check ETE toolkit status and availability"""
         try:
-            tree = self.load_ete_tree()
-            return {
-                "success": True,
-                "available": True,
-                "tree_loaded": True,
-                "num_leaves": len(tree.get_leaves()),
-                "tree_format": tree.get_tree_root().get_tree_root().write(format=1)[:100] + "..."
-            }
+            # Status probes are frequent; count leaves and serialize the tree
+            # once, not on every call
+            if self._status is None:
+                tree = self.load_ete_tree()
+                self._status = {
+                    "success": True,
+                    "available": True,
+                    "tree_loaded": True,
+                    "num_leaves": len(tree),
+                    "tree_format": tree.get_tree_root().write(format=1)[:100] + "..."
+                }
+            return dict(self._status)
         except Exception as e:
             return {
                 "success": False,
@@ -25,7 +25,12 @@ class GeneSearchService:
             self.genes_df = pd.DataFrame(genes_data["genes"])
             if not self.genes_df.empty and "id" in self.genes_df.columns:
                 self.genes_df.set_index("id", inplace=True)
-        
+            # Every gene repeats its orthogroup and species ID; as categories
+            # they are stored once and filters compare integer codes
+            for col in ("orthogroup_id", "species_id"):
+                if col in self.genes_df.columns:
+                    self.genes_df[col] = self.genes_df[col].astype("category")
+
         # Load orthogroups
         orthogroups_data = self._load_json_file("orthogroups.json")
         if orthogroups_data and "orthogroups" in orthogroups_data:
@@ -179,9 +184,9 @@ class GeneSearchService:
                     "data": []
                 }
             
-            # Search in ID and name
-            mask_id = self.genes_df.index.str.contains(query, case=False)
-            mask_name = self.genes_df["name"].str.contains(query, case=False)
+            # Search in ID and name; the query is a literal substring, not a regex
+            mask_id = self.genes_df.index.str.contains(query, case=False, regex=False)
+            mask_name = self.genes_df["name"].str.contains(query, case=False, regex=False)
             
             # Combine the masks with OR
             filtered_genes = self.genes_df[mask_id | mask_name]
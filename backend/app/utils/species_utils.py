@@ -1,5 +1,6 @@
 import logging
 import re
+from typing import Dict, Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -118,4 +119,9 @@ def get_species_full_name(species_id, species_mapping):
     # If no match found, format the species_id to look like a species name
     formatted_name = species_id.replace('_', ' ').title()
     logger.warning(f"No mapping found for species ID: {species_id}, using formatted ID: {formatted_name}")
-    return formatted_name
\ No newline at end of file
+    return formatted_name
+
+def get_species_full_names(species_ids: Iterable[str], species_mapping) -> Dict[str, str]:
+    """Resolve each distinct species ID once, for callers naming many rows"""
+    return {species_id: get_species_full_name(species_id, species_mapping)
+            for species_id in dict.fromkeys(species_ids)}
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from app.api.gene_finder import (
+    build_gene_to_orthogroup_map,
+    count_genes_by_species,
+    find_gene_orthogroup,
+)
+
+
+def make_orthogroups_df():
+    """Small orthogroups table with the quirks of the real TSV."""
+    return pd.DataFrame({
+        "Orthogroup": ["OG0000001", "OG0000002", "OG0000003"],
+        "Arabidopsis": ["AT1G01010, AT1G01020", "", "AT3G00001"],
+        "Oryza": [np.nan, "OS01G0100, ,OS01G0200 ", "AT1G01010"],
+    })
+
+
+def test_build_gene_map_splits_and_strips_cells():
+    """Every comma-separated gene maps to its row's orthogroup."""
+    gene_map = build_gene_to_orthogroup_map(make_orthogroups_df())
+
+    assert gene_map["AT1G01020"] == "OG0000001"
+    assert gene_map["OS01G0100"] == "OG0000002"
+    assert gene_map["OS01G0200"] == "OG0000002"
+    assert "" not in gene_map
+
+
+def test_build_gene_map_later_rows_win():
+    """A gene listed in several rows keeps the last orthogroup."""
+    gene_map = build_gene_to_orthogroup_map(make_orthogroups_df())
+
+    assert gene_map["AT1G01010"] == "OG0000003"
+
+
+def test_build_gene_map_skips_non_string_cells():
+    """Missing or numeric cells are ignored."""
+    df = pd.DataFrame({"Orthogroup": ["OG1", "OG2"], "sp": [np.nan, 3.5]})
+
+    assert build_gene_to_orthogroup_map(df) == {}
+
+
+def test_count_genes_by_species():
+    """Gene totals per species column ignore empty and missing cells."""
+    counts = count_genes_by_species(make_orthogroups_df())
+
+    assert counts == {"Arabidopsis": 3, "Oryza": 3}
+
+
+def test_find_gene_orthogroup_falls_back_to_dataframe():
+    """Genes missing from the map are found in the table and cached."""
+    df = make_orthogroups_df()
+    gene_map = {}
+
+    assert find_gene_orthogroup("OS01G0200", gene_map, df) == "OG0000002"
+    assert gene_map == {"OS01G0200": "OG0000002"}
+
+
+def test_find_gene_orthogroup_fallback_needs_whole_entry():
+    """A prefix of a listed gene is not a match."""
+    assert find_gene_orthogroup("AT1G0101", {}, make_orthogroups_df()) is None
+    assert find_gene_orthogroup("OS01G0", {}, make_orthogroups_df()) is None
+
+
+def test_find_gene_orthogroup_complete_map_skips_scan():
+    """With scan_on_miss=False a miss returns None without touching the table."""
+    gene_map = {}
+
+    assert find_gene_orthogroup("AT3G00001", gene_map, make_orthogroups_df(), scan_on_miss=False) is None
+    assert gene_map == {}
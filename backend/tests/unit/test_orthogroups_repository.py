@@ -0,0 +1,33 @@
+from app.data_access.orthogroups_repository import OrthogroupsRepository
+
+
+def make_repository(tmp_path):
+    """Repository over a small orthogroups TSV with the quirks of the real file."""
+    path = tmp_path / "Orthogroups.tsv"
+    path.write_text(
+        "Orthogroup\tArabidopsis\tOryza\n"
+        "OG0000001\tAT1G01010, AT1G01020\t\n"
+        "OG0000002\t\tOS01G0100, ,OS01G0200 \n"
+    )
+    repo = OrthogroupsRepository()
+    repo.ORTHOGROUPS_FILE = str(path)
+    return repo
+
+
+def test_find_gene_orthogroup_indexes_each_listed_gene(tmp_path):
+    """Genes sharing a cell are found individually, in any row."""
+    repo = make_repository(tmp_path)
+
+    assert repo.find_gene_orthogroup("AT1G01020") == "OG0000001"
+    assert repo.find_gene_orthogroup("OS01G0200") == "OG0000002"
+    assert repo.find_gene_orthogroup("AT1G01010, AT1G01020") is None
+    assert repo.find_gene_orthogroup("") is None
+
+
+def test_get_orthogroup_genes_reads_the_orthogroup_row(tmp_path):
+    """Genes come split per species, with empty cells left out."""
+    repo = make_repository(tmp_path)
+
+    assert repo.get_orthogroup_genes("OG0000002") == {"Oryza": ["OS01G0100", "", "OS01G0200"]}
+    assert repo.get_orthogroup_genes("OG0000001") == {"Arabidopsis": ["AT1G01010", "AT1G01020"]}
+    assert repo.get_orthogroup_genes("OG9999999") == {}
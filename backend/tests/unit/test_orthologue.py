@@ -0,0 +1,118 @@
+import importlib
+import os
+import pickle
+import sys
+from pathlib import Path
+
+import ete3
+import pandas as pd
+import pytest
+
+import app.api
+import app.api.orthologue as orthologue
+
+
+def test_orthologue_imports_without_ete3_qt_classes(monkeypatch):
+    """A headless ete3 without TreeStyle/NodeStyle leaves the router importable."""
+    monkeypatch.delattr(ete3, "TreeStyle")
+    monkeypatch.delattr(ete3, "NodeStyle")
+    # Restored on teardown, so other tests keep the module imported above
+    monkeypatch.delitem(sys.modules, "app.api.orthologue")
+    monkeypatch.setattr(app.api, "orthologue", orthologue)
+
+    module = importlib.import_module("app.api.orthologue")
+
+    assert module.ETE_AVAILABLE is False
+
+
+@pytest.mark.skipif(not orthologue.ETE_AVAILABLE, reason="ete3 tree styles unavailable")
+def test_style_tree_restyles_only_changed_highlights():
+    """Nodes entering the highlight set are highlighted, those leaving it get the default back."""
+    tree = ete3.Tree("((A:1,B:1):1,C:1);")
+    a, b, c = (tree & name for name in "ABC")
+
+    orthologue._style_tree(tree, {"A"})
+    untouched = c.img_style
+    assert a.img_style["bgcolor"] == "#ffcccc"
+    assert b.img_style["bgcolor"] != "#ffcccc"
+
+    orthologue._style_tree(tree, {"B"})
+    assert a.img_style["bgcolor"] == orthologue._node_style(a, False)["bgcolor"]
+    assert a.img_style["size"] == orthologue._node_style(a, False)["size"]
+    assert b.img_style["bgcolor"] == "#ffcccc"
+    assert c.img_style is untouched
+
+
+def write_orthogroups(path, rows):
+    """Write a small orthogroups TSV and return it as the loader would read it."""
+    path.write_text("Orthogroup\tArabidopsis\n" + "".join(f"{og}\t{genes}\n" for og, genes in rows))
+    return pd.read_csv(path, sep="\t")
+
+
+def test_write_sidecar_replaces_atomically(tmp_path):
+    """A finished write lands at the path; a failed one leaves neither it nor a temporary file."""
+    target = tmp_path / "data.tsv.genemap.1-1.pkl"
+    orthologue._write_sidecar(str(target), lambda tmp: Path(tmp).write_text("done"))
+
+    def fail(tmp):
+        Path(tmp).write_text("partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        orthologue._write_sidecar(str(tmp_path / "other.pkl"), fail)
+
+    assert target.read_text() == "done"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [target.name]
+
+
+def test_load_gene_map_reindexes_an_edited_file(tmp_path, monkeypatch):
+    """Editing the TSV changes its mtime/size key, so the old pickle is ignored and pruned."""
+    path = tmp_path / "Orthogroups.tsv"
+    monkeypatch.setattr(orthologue, "ORTHOGROUPS_FILE", str(path))
+    df = write_orthogroups(path, [("OG0000001", "AT1G01010")])
+    old_sidecar = orthologue._orthogroups_sidecar("genemap", "pkl")
+
+    assert orthologue._load_gene_map(df) == {"AT1G01010": "OG0000001"}
+    assert os.path.exists(old_sidecar)
+
+    df = write_orthogroups(path, [("OG0000001", "AT1G01010"), ("OG0000002", "AT1G01020")])
+    os.utime(path, ns=(1, 1))
+    new_sidecar = orthologue._orthogroups_sidecar("genemap", "pkl")
+
+    assert new_sidecar != old_sidecar
+    assert orthologue._load_gene_map(df) == {"AT1G01010": "OG0000001", "AT1G01020": "OG0000002"}
+    assert os.path.exists(new_sidecar)
+    assert not os.path.exists(old_sidecar)
+
+
+def test_load_gene_map_rejects_old_tuple_pickle(tmp_path, monkeypatch):
+    """A pickle from the (gene map, gene-to-species) format is rebuilt and overwritten."""
+    path = tmp_path / "Orthogroups.tsv"
+    monkeypatch.setattr(orthologue, "ORTHOGROUPS_FILE", str(path))
+    df = write_orthogroups(path, [("OG0000001", "AT1G01010")])
+    sidecar = orthologue._orthogroups_sidecar("genemap", "pkl")
+    with open(sidecar, "wb") as f:
+        pickle.dump(({"AT1G01010": "OG9999999"}, {"AT1G01010": ["Arabidopsis"]}), f)
+
+    assert orthologue._load_gene_map(df) == {"AT1G01010": "OG0000001"}
+    with open(sidecar, "rb") as f:
+        assert pickle.load(f) == {"AT1G01010": "OG0000001"}
+
+
+def test_prune_sidecars_removes_only_this_files_outdated_sidecars(tmp_path, monkeypatch):
+    """Other kinds, other files and the current sidecar survive; glob characters in the name are literal."""
+    path = tmp_path / "Orthogroups[1].tsv"
+    monkeypatch.setattr(orthologue, "ORTHOGROUPS_FILE", str(path))
+    names = [
+        "Orthogroups[1].tsv.genemap.1-10.pkl",
+        "Orthogroups[1].tsv.genemap.2-20.pkl",
+        "Orthogroups[1].tsv.table.1-10.parquet",
+        "Orthogroups1.tsv.genemap.1-10.pkl",
+        "Other.tsv.genemap.1-10.pkl",
+    ]
+    for name in names:
+        (tmp_path / name).write_text("")
+
+    orthologue._prune_sidecars("genemap", "pkl", str(tmp_path / names[1]))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(names[1:])
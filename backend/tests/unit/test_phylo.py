@@ -0,0 +1,85 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from app.models.phylo import TreeData
+
+# The top-level app/api/phylo.py router imports ..models.phylo; loaded as a
+# sibling of app.api it resolves against this tree's app.models.phylo
+PHYLO_PATH = Path(__file__).resolve().parents[3] / "app" / "api" / "phylo.py"
+_spec = importlib.util.spec_from_file_location("app.api._toplevel_phylo", PHYLO_PATH)
+phylo = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(phylo)
+
+
+def test_reroot_leaves_the_cached_tree_untouched():
+    """Rerooting works on a copy, so a repeated payload rerooted elsewhere starts from the original."""
+    newick = "((A:1,B:1)x:1,(C:1,D:2)y:1);"
+    original = phylo._parse_tree_cached(newick).write(format=1)
+
+    first = phylo._reroot(TreeData(newick=newick, outgroup="A"))
+    second = phylo._reroot(TreeData(newick=newick, outgroup="D"))
+
+    assert phylo._parse_tree_cached(newick).write(format=1) == original
+    assert first["newick"] != second["newick"]
+    assert "A" in {child["name"] for child in first["tree"]["children"]}
+    assert "D" in {child["name"] for child in second["tree"]["children"]}
+
+
+def test_parse_newick_iter_builds_nested_nodes():
+    """Labels, quoted names and branch lengths land on the right nodes."""
+    root = phylo._parse_newick_iter("((A:1,'b c':2)x:0.5,C)root;")
+
+    assert root["name"] == "root"
+    inner, leaf_c = root["children"]
+    assert (inner["name"], inner["length"]) == ("x", 0.5)
+    assert [(child["name"], child["length"]) for child in inner["children"]] == [("A", 1.0), ("b c", 2.0)]
+    assert leaf_c["children"] is None
+
+
+@pytest.mark.parametrize("newick", ["A,B;", "(A,B),C;", "((A,B);", "(A,B));"])
+def test_parse_newick_iter_rejects_malformed_input(newick):
+    """Unbalanced parentheses and several top-level nodes are reported, not truncated."""
+    with pytest.raises(ValueError):
+        phylo._parse_newick_iter(newick)
+
+
+def test_tree_to_dict_merges_annotations():
+    """Annotations keyed by node name are merged into the emitted node dicts."""
+    tree = phylo.Tree("((A:1,B:2)x:1,C:0);", format=1)
+
+    root = phylo._tree_to_dict(tree, {"A": {"color": "red"}, "x": {"label": "clade"}})
+
+    inner, leaf_c = root["children"]
+    assert inner["label"] == "clade"
+    assert inner["children"][0] == {
+        "color": "red", "id": "A", "name": "A", "length": 1.0, "support": None, "children": None,
+    }
+    assert leaf_c["length"] is None
+
+
+def test_leaves_of_skips_internal_labels():
+    """Only labels that do not follow ')' count as leaves."""
+    assert phylo._leaves_of("((A,'b c')x:1,C)root;") == frozenset({"A", "b c", "C"})
+
+
+def test_compare_reports_leaf_sets_and_rf_distance():
+    """Shared and unique leaves are listed, and RF counts splits present in one tree only."""
+    result = phylo._compare({"tree1": "((A,B),(C,D),E);", "tree2": "((A,C),(B,D),F);"})
+
+    assert sorted(result["common_leaves"]) == ["A", "B", "C", "D"]
+    assert result["unique_to_tree1"] == ["E"]
+    assert result["unique_to_tree2"] == ["F"]
+    assert result["rf_distance"] == 2
+
+
+def test_bipartitions_ignore_rooting():
+    """The same unrooted topology rooted on different leaves has the same splits."""
+    leaf_bits = {name: 1 << i for i, name in enumerate("ABCDE")}
+
+    splits1 = phylo._bipartitions(phylo._parse_newick_iter("((A,B),(C,(D,E)));"), leaf_bits)
+    splits2 = phylo._bipartitions(phylo._parse_newick_iter("(E,(D,(C,(A,B))));"), leaf_bits)
+
+    # {A,B} | {C,D,E} is kept as its side without A
+    assert splits1 == splits2 == {0b11100, 0b11000}